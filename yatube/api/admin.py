@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Token
+
+
+@admin.register(Token)
+class TokenAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'created',)
+    search_fields = ('user__username',)
+    readonly_fields = ('key', 'created',)
+    raw_id_fields = ('user',)
@@ -0,0 +1,42 @@
+from functools import wraps
+from http import HTTPStatus
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import Token
+
+KEYWORD = 'Token'
+
+
+def error(status, detail):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def get_token(request):
+    keyword, _, key = request.META.get(
+        'HTTP_AUTHORIZATION', ''
+    ).partition(' ')
+    if keyword != KEYWORD or not key.strip():
+        return None
+    return Token.objects.select_related('user').filter(
+        key=key.strip(), user__is_active=True
+    ).first()
+
+
+def token_required(view):
+    # Токен не живёт в cookie, поэтому CSRF-проверка здесь не нужна.
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = get_token(request)
+        if token is None:
+            response = error(
+                HTTPStatus.UNAUTHORIZED,
+                f'Нужен заголовок Authorization: { KEYWORD } <ключ>',
+            )
+            response['WWW-Authenticate'] = KEYWORD
+            return response
+        request.user = token.user
+        return view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Token, User
+
+
+class Command(BaseCommand):
+    help = 'Выпускает токен API для пользователя'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь { options["username"] } не найден'
+            )
+        self.stdout.write(Token.objects.create(user=user).key)
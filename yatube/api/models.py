@@ -0,0 +1,36 @@
+import secrets
+
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class Token(models.Model):
+    key = models.CharField(
+        max_length=40,
+        primary_key=True,
+        verbose_name='Ключ',
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='api_tokens',
+        verbose_name='Пользователь',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+
+    class Meta:
+        verbose_name = 'Токен API'
+        verbose_name_plural = 'Токены API'
+
+    def __str__(self):
+        return f'{ self.user } ({ self.key[:8] }…)'
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = secrets.token_hex(20)
+        super().save(*args, **kwargs)
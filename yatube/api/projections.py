@@ -0,0 +1,70 @@
+from django.core.files.storage import default_storage
+
+from core.paginator import CursorPage, CursorPaginator, encode_cursor
+
+# Курсор строится по дате и ключу, поэтому они выбираются всегда, даже
+# если клиент их не запросил.
+CURSOR_KEYS = ('id', 'pub_date')
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Projection:
+    def __init__(self, fields, convert=None):
+        self.fields = fields
+        self.convert = convert or {}
+
+    def parse(self, value):
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                f'Неизвестные поля: { ", ".join(unknown) }. '
+                f'Доступны: { ", ".join(self.fields) }'
+            )
+        return list(dict.fromkeys(names))
+
+    def values(self, queryset, names):
+        return queryset.values(
+            *dict.fromkeys([self.fields[name] for name in names]
+                           + list(CURSOR_KEYS))
+        )
+
+    def serialize(self, row, names):
+        result = {}
+        for name in names:
+            value = row[self.fields[name]]
+            convert = self.convert.get(name)
+            result[name] = convert(value) if convert else value
+        return result
+
+
+POST = Projection({
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}, {'image': media_url})
+COMMENT = Projection({
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+})
+
+
+class ValuesPage(CursorPage):
+    @staticmethod
+    def cursor(row):
+        return encode_cursor(row['pub_date'], row['id'])
+
+
+class ValuesPaginator(CursorPaginator):
+    page_class = ValuesPage
@@ -0,0 +1,243 @@
+import base64
+import json
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import (AuthorStats, Follow, Group, Post, ThumbnailJob,
+                          TimelineEntry, User)
+from posts.search import SearchPaginator
+
+from ..models import Token
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+USERNAME = 'Importer'
+USERNAME_2 = 'Follower'
+BULK_URL = reverse('api:posts_bulk')
+SLUG = 'test-slug'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class BulkPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        Follow.objects.create(user=cls.user2, author=cls.user)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client = Client(HTTP_AUTHORIZATION=f'Token { cls.token.key }')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def send(self, items, client=None):
+        return (client or self.api_client).post(
+            BULK_URL, json.dumps(items), content_type='application/json'
+        )
+
+    def test_token_is_required(self):
+        for client in (Client(), Client(HTTP_AUTHORIZATION='Token wrong')):
+            with self.subTest(client=client):
+                response = self.send([{'text': 'Текст'}], client)
+                self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+                self.assertEqual(response['WWW-Authenticate'], 'Token')
+        self.assertFalse(Post.objects.exists())
+
+    def test_posts_are_created_with_derived_data(self):
+        response = self.send([
+            {'text': 'Первый пост про море'},
+            {'text': 'Второй пост', 'group': SLUG},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        first, second = (
+            Post.objects.get(pk=item['id']) for item in data['results']
+        )
+        self.assertEqual(
+            data['results'][0]['url'],
+            reverse('posts:post_detail', args=[first.pk]),
+        )
+        self.assertEqual(first.text, 'Первый пост про море')
+        self.assertEqual(first.author, self.user)
+        self.assertIsNone(first.group)
+        self.assertEqual(second.group, self.group)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 2
+        )
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.user2).values_list(
+                'post', flat=True
+            )),
+            {first.pk, second.pk},
+        )
+        if connection.vendor == 'sqlite':
+            self.assertEqual(
+                [post.pk for post in SearchPaginator('море', 10).get_page()],
+                [first.pk],
+            )
+
+    def test_base64_image(self):
+        response = self.send([{
+            'text': 'Пост с картинкой',
+            'image': base64.b64encode(SMALL_GIF).decode(),
+        }])
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        post = Post.objects.get(pk=response.json()['results'][0]['id'])
+        self.assertTrue(post.image.name.endswith('.gif'))
+        self.assertTrue(post.thumbnail_pending)
+        self.assertTrue(ThumbnailJob.objects.filter(post=post).exists())
+
+    def test_multipart_image(self):
+        response = self.api_client.post(BULK_URL, {
+            'posts': json.dumps([{'text': 'Пост с файлом', 'image': 'one'}]),
+            'one': SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        })
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        post = Post.objects.get(pk=response.json()['results'][0]['id'])
+        self.assertTrue(post.image.name.startswith(
+            f'{ settings.UPLOAD_TO }small'
+        ))
+
+    def test_non_string_image_fields_are_rejected(self):
+        image = base64.b64encode(SMALL_GIF).decode()
+        response = self.send([
+            {'text': 'Имя числом', 'image': image, 'image_name': 5},
+            {'text': 'Картинка списком', 'image': ['x']},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        for item in response.json()['results']:
+            with self.subTest(index=item['index']):
+                self.assertEqual(
+                    item['errors']['image'][0]['code'], 'invalid'
+                )
+        self.assertFalse(Post.objects.exists())
+
+    def test_multipart_non_string_image_is_rejected(self):
+        response = self.api_client.post(BULK_URL, {
+            'posts': json.dumps([
+                {'text': 'Список', 'image': ['one']},
+                {'text': 'Словарь', 'image': {'a': 1}},
+            ]),
+            'one': SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        })
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            [item['errors']['image'][0]['code']
+             for item in response.json()['results']],
+            ['invalid', 'invalid'],
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_invalid_items_are_reported(self):
+        response = self.send([
+            {'text': 'Хороший пост'},
+            {'text': ''},
+            {'text': 'Нет группы', 'group': 'missing'},
+            {'text': 'Битая картинка', 'image': 'не base64'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        results = response.json()['results']
+        self.assertEqual(response.json()['created'], 1)
+        self.assertIn('id', results[0])
+        self.assertEqual(
+            [list(item['errors']) for item in results[1:]],
+            [['text'], ['group'], ['image']],
+        )
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_nothing_valid(self):
+        response = self.send([{'text': ''}])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 0
+        )
+
+    def test_malformed_body(self):
+        for body in ('{', '{"text": "не массив"}', '[]', '["строка"]'):
+            with self.subTest(body=body):
+                response = self.api_client.post(
+                    BULK_URL, body, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertIn('detail', response.json())
+
+    @override_settings(API_MAX_BATCH=2)
+    def test_batch_size_is_limited(self):
+        response = self.send([{'text': 'Текст'}] * 3)
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(API_RATE_LIMIT=3)
+    def test_rate_limit_per_author(self):
+        self.assertEqual(
+            self.send([{'text': 'Текст'}] * 2).status_code,
+            HTTPStatus.CREATED,
+        )
+        response = self.send([{'text': 'Текст'}] * 2)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            self.send([{'text': 'Текст'}]).status_code, HTTPStatus.CREATED
+        )
+        other = Client(HTTP_AUTHORIZATION=(
+            f'Token { Token.objects.create(user=self.user2).key }'
+        ))
+        self.assertEqual(
+            self.send([{'text': 'Текст'}] * 3, other).status_code,
+            HTTPStatus.CREATED,
+        )
+
+    @override_settings(API_RATE_LIMIT=2)
+    def test_rate_limit_counts_only_valid_posts(self):
+        self.assertEqual(
+            self.send([{'text': ''}] * 5).status_code, HTTPStatus.BAD_REQUEST
+        )
+        response = self.send([{'text': 'Текст'}, {'text': ''}] * 2)
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_queries_do_not_grow_with_batch(self):
+        self.send([{'text': 'Текст'}])
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.send([{'text': 'Текст', 'group': SLUG}] * size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
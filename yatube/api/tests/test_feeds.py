@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+USERNAME = 'Author'
+SLUG = 'test-slug'
+INDEX_URL = reverse('api:index')
+GROUP_URL = reverse('api:group_list', args=[SLUG])
+PROFILE_URL = reverse('api:profile', args=[USERNAME])
+POST_FIELDS = ['id', 'text', 'pub_date', 'updated', 'author', 'group',
+               'image']
+
+
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Имя'
+        )
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        for index in range(settings.NUM_POSTS + 5):
+            Post.objects.create(
+                text=f'Тест текст { index }',
+                author=cls.user,
+                group=cls.group if index % 2 else None,
+            )
+        cls.post = Post.objects.latest('pub_date', 'pk')
+        Comment.objects.create(post=cls.post, author=cls.user, text='Коммент')
+        cls.guest_client = Client()
+
+    def test_index_pages_with_cursors(self):
+        first = self.guest_client.get(INDEX_URL).json()
+        self.assertEqual(len(first['results']), settings.NUM_POSTS)
+        self.assertEqual(list(first['results'][0]), POST_FIELDS)
+        self.assertEqual(first['results'][0]['id'], self.post.pk)
+        self.assertEqual(first['results'][0]['author'], USERNAME)
+        self.assertIsNone(first['previous'])
+        second = self.guest_client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )),
+        )
+        back = self.guest_client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_sparse_fields(self):
+        response = self.guest_client.get(INDEX_URL, {'fields': 'text,group'})
+        data = response.json()
+        self.assertEqual(
+            {tuple(row) for row in data['results']}, {('text', 'group')}
+        )
+        self.assertIn('fields=text%2Cgroup', data['next'])
+        response = self.guest_client.get(INDEX_URL, {'fields': 'password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('password', response.json()['detail'])
+
+    def test_group_and_profile_feeds(self):
+        group = self.guest_client.get(GROUP_URL).json()
+        self.assertEqual(group['group']['title'], self.group.title)
+        self.assertEqual(
+            {row['group'] for row in group['results']}, {SLUG}
+        )
+        profile = self.guest_client.get(PROFILE_URL).json()
+        self.assertEqual(profile['author']['first_name'], 'Имя')
+        self.assertEqual(len(profile['results']), settings.NUM_POSTS)
+        for url in (reverse('api:group_list', args=['missing']),
+                    reverse('api:profile', args=['missing'])):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertIn('detail', response.json())
+
+    def test_post_detail_and_comments(self):
+        response = self.guest_client.get(
+            reverse('api:post_detail', args=[self.post.pk]),
+            {'fields': 'text'},
+        )
+        self.assertEqual(response.json(), {'text': self.post.text})
+        comments = self.guest_client.get(
+            reverse('api:post_comments', args=[self.post.pk])
+        ).json()
+        self.assertEqual(
+            [(row['text'], row['author']) for row in comments['results']],
+            [('Коммент', USERNAME)],
+        )
+        for name in ('api:post_detail', 'api:post_comments'):
+            with self.subTest(name=name):
+                response = self.guest_client.get(reverse(name, args=[0]))
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_etag(self):
+        response = self.guest_client.get(INDEX_URL)
+        self.assertIn('no-cache', response['Cache-Control'])
+        repeated = self.guest_client.get(
+            INDEX_URL, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(repeated.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(repeated.content, b'')
+        Post.objects.create(text='Новый пост', author=self.user)
+        changed = self.guest_client.get(
+            INDEX_URL, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(changed.status_code, HTTPStatus.OK)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_feeds_use_projections(self):
+        with self.assertNumQueries(1):
+            self.guest_client.get(INDEX_URL)
+        with self.assertNumQueries(2):
+            self.guest_client.get(PROFILE_URL)
+
+    def test_read_only(self):
+        response = self.guest_client.post(INDEX_URL)
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+        )
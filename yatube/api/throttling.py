@@ -0,0 +1,29 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def consume(user, amount):
+    # Окно фиксированное: счётчик живёт в кэше до конца периода.
+    # Возвращает, сколько секунд ждать, если лимит превышен. Лимит точен
+    # только на бэкенде с атомарным incr (memcached, локальная память
+    # одного процесса): файловый кэш читает и пишет счётчик отдельно, и
+    # параллельные запросы могут потерять приращения.
+    period = settings.API_RATE_PERIOD
+    window = int(time.time() // period)
+    key = f'api:rate:{ user.pk }:{ window }'
+    cache.add(key, 0, period)
+    try:
+        total = cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, period)
+        total = amount
+    if total <= settings.API_RATE_LIMIT:
+        return 0
+    try:
+        cache.decr(key, amount)
+    except ValueError:
+        pass
+    return max(math.ceil((window + 1) * period - time.time()), 1)
@@ -0,0 +1,251 @@
+import base64
+import binascii
+import json
+from functools import wraps
+from http import HTTPStatus
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, set_response_etag)
+from django.views.decorators.http import require_POST, require_safe
+from PIL import Image
+
+from core.decorators import query_budget
+from posts import publishing
+from posts.forms import BulkPostForm
+from posts.models import Comment, Group, Post, User
+
+from . import throttling
+from .auth import error, token_required
+from .projections import COMMENT, POST, ValuesPaginator
+
+MULTIPART = 'multipart/form-data'
+
+
+def load_items(request):
+    try:
+        if request.content_type == MULTIPART:
+            items = json.loads(request.POST.get('posts', ''))
+        else:
+            items = json.loads(request.body.decode())
+    except ValueError:
+        raise ValueError('Тело запроса не является корректным JSON')
+    if (not isinstance(items, list) or not items
+            or not all(isinstance(item, dict) for item in items)):
+        raise ValueError('Ожидается непустой массив объектов постов')
+    return items
+
+
+def image_name(content):
+    try:
+        format_ = Image.open(BytesIO(content)).format
+    except OSError:
+        format_ = None
+    return f'image.{ (format_ or "bin").lower() }'
+
+
+def load_image(item, files):
+    image = item.get('image')
+    if not image:
+        return None
+    if not isinstance(image, str):
+        raise ValidationError(
+            'Изображение должно быть строкой.', code='invalid'
+        )
+    name = item.get('image_name')
+    if name is not None and not isinstance(name, str):
+        raise ValidationError(
+            'Имя изображения должно быть строкой.', code='invalid'
+        )
+    if files is not None:
+        if image not in files:
+            raise ValidationError(
+                'Файл «%(name)s» не передан в запросе.',
+                code='missing', params={'name': image},
+            )
+        return files[image]
+    try:
+        content = base64.b64decode(image, validate=True)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValidationError(
+            'Изображение должно быть строкой в base64.', code='invalid'
+        )
+    return SimpleUploadedFile(name or image_name(content), content)
+
+
+def build_form(item, files, groups):
+    try:
+        image = load_image(item, files)
+    except ValidationError as image_error:
+        form = BulkPostForm(data=item, groups=groups)
+        form.add_error('image', image_error)
+        return form
+    return BulkPostForm(
+        data=item, files={'image': image} if image else None, groups=groups
+    )
+
+
+def result(index, form):
+    if form.errors:
+        return {'index': index, 'errors': form.errors.get_json_data()}
+    return {
+        'index': index,
+        'id': form.instance.pk,
+        'url': reverse('posts:post_detail', args=[form.instance.pk]),
+    }
+
+
+@require_POST
+@token_required
+def posts_bulk(request):
+    try:
+        items = load_items(request)
+    except ValueError as load_error:
+        return error(HTTPStatus.BAD_REQUEST, str(load_error))
+    if len(items) > settings.API_MAX_BATCH:
+        return error(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            f'В одном запросе не больше { settings.API_MAX_BATCH } постов',
+        )
+    groups = Group.objects.in_bulk(
+        {item['group'] for item in items
+         if isinstance(item.get('group'), str)},
+        field_name='slug',
+    )
+    files = request.FILES if request.content_type == MULTIPART else None
+    forms = [build_form(item, files, groups) for item in items]
+    valid = [form for form in forms if form.is_valid()]
+    if valid:
+        # В лимит идут только посты, которые будут опубликованы.
+        retry_after = throttling.consume(request.user, len(valid))
+        if retry_after:
+            response = error(
+                HTTPStatus.TOO_MANY_REQUESTS, 'Превышен лимит публикаций'
+            )
+            response['Retry-After'] = retry_after
+            return response
+        publishing.publish(
+            request.user, [form.save(commit=False) for form in valid]
+        )
+    if len(valid) == len(forms):
+        status = HTTPStatus.CREATED
+    elif valid:
+        status = HTTPStatus.MULTI_STATUS
+    else:
+        status = HTTPStatus.BAD_REQUEST
+    return JsonResponse({
+        'created': len(valid),
+        'results': [result(index, form) for index, form in enumerate(forms)],
+    }, status=status)
+
+
+def etagged(view):
+    # Ответы маленькие, поэтому ETag считаем по телу: клиент с актуальной
+    # копией получает 304 без передачи данных.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code != HTTPStatus.OK:
+            return response
+        set_response_etag(response)
+        patch_cache_control(response, public=True, no_cache=True)
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response
+        )
+    return wrapper
+
+
+def link(request, key, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[key] = cursor
+    return f'{ request.path }?{ params.urlencode() }'
+
+
+def listing(request, queryset, projection, per_page, **extra):
+    try:
+        names = projection.parse(request.GET.get('fields'))
+    except ValueError as fields_error:
+        return error(HTTPStatus.BAD_REQUEST, str(fields_error))
+    page = ValuesPaginator(
+        projection.values(queryset, names), per_page
+    ).get_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    return JsonResponse({
+        **extra,
+        'results': [projection.serialize(row, names) for row in page],
+        'next': link(request, 'after', page.next_cursor),
+        'previous': link(request, 'before', page.previous_cursor),
+    })
+
+
+@query_budget(2)
+@require_safe
+@etagged
+def index(request):
+    return listing(request, Post.objects.all(), POST, settings.NUM_POSTS)
+
+
+@query_budget(3)
+@require_safe
+@etagged
+def group_posts(request, slug):
+    group = Group.objects.values(
+        'title', 'slug', 'description'
+    ).filter(slug=slug).first()
+    if group is None:
+        return error(HTTPStatus.NOT_FOUND, 'Группа не найдена')
+    return listing(
+        request, Post.objects.filter(group__slug=slug), POST,
+        settings.NUM_POSTS, group=group,
+    )
+
+
+@query_budget(3)
+@require_safe
+@etagged
+def profile(request, username):
+    author = User.objects.values(
+        'username', 'first_name', 'last_name'
+    ).filter(username=username).first()
+    if author is None:
+        return error(HTTPStatus.NOT_FOUND, 'Автор не найден')
+    return listing(
+        request, Post.objects.filter(author__username=username), POST,
+        settings.NUM_POSTS, author=author,
+    )
+
+
+@query_budget(1)
+@require_safe
+@etagged
+def post_detail(request, post_id):
+    try:
+        names = POST.parse(request.GET.get('fields'))
+    except ValueError as fields_error:
+        return error(HTTPStatus.BAD_REQUEST, str(fields_error))
+    row = POST.values(Post.objects.filter(pk=post_id), names).first()
+    if row is None:
+        return error(HTTPStatus.NOT_FOUND, 'Пост не найден')
+    return JsonResponse(POST.serialize(row, names))
+
+
+@query_budget(3)
+@require_safe
+@etagged
+def post_comments(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return error(HTTPStatus.NOT_FOUND, 'Пост не найден')
+    return listing(
+        request, Comment.objects.filter(post_id=post_id), COMMENT,
+        settings.NUM_COMMENTS,
+    )
@@ -3,3 +3,23 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import instrumentation, pool
+
+        request_started.connect(pool.schedule_checks)
+        connection_created.connect(pool.count_opened)
+        instrumentation.registry.register_counter(
+            'yatube_db_connection_events_total',
+            'Открытые, переиспользованные, отброшенные и устаревшие '
+            'соединения с БД',
+            pool.stats.collect,
+        )
+        instrumentation.registry.register_gauge(
+            'yatube_db_pool_idle',
+            'Свободные соединения в пуле процесса',
+            pool.collect_idle,
+        )
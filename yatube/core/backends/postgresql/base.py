@@ -0,0 +1,9 @@
+from django.db.backends.postgresql import base
+
+from core.pool import (HealthCheckedDatabaseWrapperMixin,
+                       PooledDatabaseWrapperMixin)
+
+
+class DatabaseWrapper(HealthCheckedDatabaseWrapperMixin,
+                      PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
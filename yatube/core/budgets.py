@@ -0,0 +1,97 @@
+import logging
+import os
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+OFF = 'off'
+LOG = 'log'
+RAISE = 'raise'
+TRANSACTION_CONTROL = (
+    'BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO',
+)
+
+logger = logging.getLogger('yatube.queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def budget_for(match):
+    if match is None:
+        return None
+    return settings.QUERY_BUDGETS.get(
+        match.view_name, getattr(match.func, 'query_budget', None)
+    )
+
+
+def counted(sql):
+    # Хранилище sorl-thumbnail заполняется один раз на картинку, а
+    # BEGIN и точки сохранения не ходят за данными — ни то ни другое не
+    # N+1. Без BEGIN счёт в тестах (там вместо него SAVEPOINT) и в бою
+    # совпадает.
+    return not sql.startswith(TRANSACTION_CONTROL) and not any(
+        f'"{ table }"' in sql
+        for table in settings.QUERY_BUDGET_IGNORED_TABLES
+    )
+
+
+def project_stack():
+    # Кадры Django и сторонних библиотек только мешают найти шаблон или
+    # view, из-за которых выросло число запросов.
+    return [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(settings.BASE_DIR)
+        and f'{ os.sep }site-packages{ os.sep }' not in frame.filename
+    ]
+
+
+class QueryRecorder:
+    def __init__(self, request):
+        self.request = request
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not counted(sql):
+            return execute(sql, params, many, context)
+        # Стек дорог, поэтому снимаем его только с запросов сверх бюджета.
+        limit = budget_for(getattr(self.request, 'resolver_match', None))
+        stack = None
+        if limit is not None and len(self.queries) >= limit:
+            stack = project_stack()
+        self.queries.append((sql, stack))
+        return execute(sql, params, many, context)
+
+    def report(self, view, limit):
+        lines = [
+            f'{ view }: { len(self.queries) } запросов к БД '
+            f'при бюджете { limit }'
+        ]
+        for number, (sql, stack) in enumerate(self.queries, 1):
+            lines.append(f'{ number }. { sql }')
+            for frame in traceback.format_list(stack or []):
+                lines += [f'    { line }' for line in frame.splitlines()]
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record(request):
+    recorder = QueryRecorder(request)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def check(request, recorder):
+    match = getattr(request, 'resolver_match', None)
+    limit = budget_for(match)
+    if limit is None or len(recorder.queries) <= limit:
+        return
+    report = recorder.report(match.view_name, limit)
+    logger.warning(report)
+    if settings.QUERY_BUDGET_MODE == RAISE:
+        raise QueryBudgetExceeded(report)
@@ -0,0 +1,48 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POSTS_GENERATION = 'posts'
+PAGES_GENERATION = 'pages'
+# Версия формата закэшированной страницы, сейчас — пара (ответ, ключ ETag).
+PAGE_CACHE_VERSION = 2
+
+
+def generation_key(namespace):
+    return f'generation:{ namespace }'
+
+
+def get_generation(namespace=POSTS_GENERATION):
+    # Кэш может вытеснить счётчик. Начни он заново с 1, ключи прошлых
+    # поколений совпали бы снова, поэтому заводим его от текущего времени.
+    return cache.get_or_set(generation_key(namespace), time.time_ns, None)
+
+
+def bump_generation(namespace=POSTS_GENERATION):
+    try:
+        return cache.incr(generation_key(namespace))
+    except ValueError:
+        generation = time.time_ns()
+        cache.set(generation_key(namespace), generation, None)
+        return generation
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return (f'page:{ get_generation() }:'
+            f'{ get_generation(PAGES_GENERATION) }:{ path }')
+
+
+def get_page(request):
+    return cache.get(page_key(request), version=PAGE_CACHE_VERSION)
+
+
+def set_page(request, content, key):
+    cache.set(
+        page_key(request),
+        (content, key),
+        settings.PAGE_CACHE_SECONDS,
+        version=PAGE_CACHE_VERSION,
+    )
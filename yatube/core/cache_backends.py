@@ -0,0 +1,92 @@
+import threading
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from .instrumentation import record_cache
+
+MISSING = object()
+
+
+class CacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits=0, misses=0):
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def as_dict(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+
+
+class InstrumentedCache(BaseCache):
+    def __init__(self, location, params):
+        params = dict(params)
+        backend = params.pop('WRAPPED_BACKEND')
+        super().__init__(params)
+        self.backend = backend
+        self.wrapped = import_string(backend)(location, params)
+        self.stats = CacheStats()
+
+    def get(self, key, default=None, version=None):
+        value = self.wrapped.get(key, MISSING, version=version)
+        if value is MISSING:
+            self.stats.record(misses=1)
+            record_cache(misses=1)
+            return default
+        self.stats.record(hits=1)
+        record_cache(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self.wrapped.get_many(keys, version=version)
+        self.stats.record(
+            hits=len(values), misses=len(keys) - len(values)
+        )
+        record_cache(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.wrapped.add(key, value, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.wrapped.set(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.wrapped.set_many(data, timeout, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.wrapped.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        return self.wrapped.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        return self.wrapped.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.wrapped.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.wrapped.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.wrapped.decr(key, delta, version)
+
+    def clear(self):
+        return self.wrapped.clear()
+
+    def close(self, **kwargs):
+        return self.wrapped.close(**kwargs)
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import get_generation
+
+
+def cache_generation(request):
+    return {
+        'cache_generation': SimpleLazyObject(get_generation),
+        'fragment_cache_seconds': settings.FRAGMENT_CACHE_SECONDS,
+    }
@@ -0,0 +1,98 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from . import holes
+from .cache import get_page, set_page
+
+
+def internal_only(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.user.is_staff
+                or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+            return view(request, *args, **kwargs)
+        raise PermissionDenied
+    return wrapper
+
+
+def query_budget(limit):
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def render_for_cache(response):
+    # Общая копия собирается как для анонима, личные куски остаются метками.
+    response.context_data.update(page_cache=True, user=AnonymousUser())
+    return response.render().content.decode(response.charset)
+
+
+def build_page(request, view, args, kwargs, state, cache):
+    # Возвращает ответ, разметку с метками (если страница кэшируется) и
+    # ключ содержимого.
+    if cache and request.method in ('GET', 'HEAD'):
+        cached = get_page(request)
+        if cached is not None:
+            return (HttpResponse(), *cached)
+    response = view(request, *args, **kwargs)
+    if (request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or not getattr(response, 'context_data', None)):
+        return response, None, None
+    key = state(response.context_data)
+    content = None
+    if cache:
+        content = render_for_cache(response)
+        set_page(request, content, key)
+    return response, content, key
+
+
+def validate(request, response, content, key):
+    parts = []
+    if content is not None:
+        content, parts = holes.fill(content, request)
+    etag = quote_etag(hashlib.md5(
+        repr((request.user.pk, key, parts)).encode()
+    ).hexdigest())
+    response['ETag'] = etag
+    # Last-Modified не отдаём: время последней правки видимых постов
+    # откатывается при удалении и не меняется от счётчиков подписок, и
+    # клиент с одним If-Modified-Since получил бы устаревший 304.
+    conditional = get_conditional_response(
+        request, etag=etag, response=response,
+    )
+    if conditional is response and content is not None:
+        response.content = content
+    return conditional
+
+
+def conditional_page(state, cache=False):
+    # Ключ и время изменения считаются по контексту ещё не отрисованного
+    # TemplateResponse, поэтому на 304 шаблон страницы не рендерится.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response, content, key = build_page(
+                request, view, args, kwargs, state, cache
+            )
+            if key is not None:
+                response = validate(request, response, content, key)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=settings.ANONYMOUS_CACHE_SECONDS,
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+import base64
+import json
+import re
+
+from django.template.loader import render_to_string
+
+MARKER = re.compile(r'<!--hole:(\w+):([\w-]*)-->')
+
+registry = {}
+
+
+def register(name, template_name):
+    def decorator(get_context):
+        registry[name] = (template_name, get_context)
+        return get_context
+    return decorator
+
+
+def marker(name, kwargs):
+    data = base64.urlsafe_b64encode(json.dumps(kwargs).encode()).decode()
+    return f'<!--hole:{ name }:{ data.rstrip("=") }-->'
+
+
+def render(request, name, kwargs):
+    template_name, get_context = registry[name]
+    return render_to_string(
+        template_name, get_context(request, **kwargs), request=request
+    )
+
+
+def fill(content, request):
+    parts = []
+
+    def replace(match):
+        data = match[2] + '=' * (-len(match[2]) % 4)
+        parts.append(render(
+            request, match[1], json.loads(base64.urlsafe_b64decode(data))
+        ))
+        return parts[-1]
+
+    return MARKER.sub(replace, content), parts
+
+
+@register('auth_links', 'includes/auth_links.html')
+def auth_links(request):
+    return {}
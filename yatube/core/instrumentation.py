@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import Template
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UNRESOLVED = '<unresolved>'
+COUNTERS = (
+    ('requests', 'yatube_requests_total', 'Обработано запросов'),
+    ('errors', 'yatube_request_errors_total',
+     'Ответов с кодом 5xx'),
+    ('sampled', 'yatube_sampled_requests_total',
+     'Запросов с подробными замерами'),
+    ('db_queries', 'yatube_db_queries_total',
+     'Запросов к БД в замеренных запросах'),
+    ('db_time', 'yatube_db_duration_seconds_total',
+     'Время запросов к БД в замеренных запросах'),
+    ('template_time', 'yatube_template_duration_seconds_total',
+     'Время отрисовки шаблонов в замеренных запросах'),
+    ('cache_hits', 'yatube_cache_hits_total',
+     'Попадания в кэш в замеренных запросах'),
+    ('cache_misses', 'yatube_cache_misses_total',
+     'Промахи кэша в замеренных запросах'),
+)
+
+local = threading.local()
+
+
+class RequestStats:
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def as_dict(self):
+        return {
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'template_ms': round(self.template_time * 1000, 3),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.sampled = 0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(ViewMetrics)
+        self.collectors = {}
+
+    def observe(self, view, duration, error, stats=None):
+        with self.lock:
+            metrics = self.views[view]
+            metrics.requests += 1
+            metrics.errors += error
+            metrics.duration += duration
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    metrics.buckets[index] += 1
+            if stats is None:
+                return
+            metrics.sampled += 1
+            metrics.db_queries += stats.db_queries
+            metrics.db_time += stats.db_time
+            metrics.template_time += stats.template_time
+            metrics.cache_hits += stats.cache_hits
+            metrics.cache_misses += stats.cache_misses
+
+    def register_gauge(self, name, help_text, collect):
+        self.collectors[name] = ('gauge', help_text, collect)
+
+    def register_counter(self, name, help_text, collect):
+        self.collectors[name] = ('counter', help_text, collect)
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self):
+        with self.lock:
+            views = sorted(
+                (view, vars(metrics).copy())
+                for view, metrics in self.views.items()
+            )
+            collectors = sorted(self.collectors.items())
+        lines = []
+        for field, name, help_text in COUNTERS:
+            lines += header(name, 'counter', help_text)
+            lines += [
+                sample(name, {'view': view}, metrics[field])
+                for view, metrics in views
+            ]
+        name = 'yatube_request_duration_seconds'
+        lines += header(name, 'histogram', 'Время ответа')
+        for view, metrics in views:
+            for bound, count in zip(BUCKETS, metrics['buckets']):
+                lines.append(sample(
+                    f'{ name }_bucket', {'view': view, 'le': bound}, count
+                ))
+            lines.append(sample(
+                f'{ name }_bucket', {'view': view, 'le': '+Inf'},
+                metrics['requests'],
+            ))
+            lines.append(
+                sample(f'{ name }_sum', {'view': view}, metrics['duration'])
+            )
+            lines.append(
+                sample(f'{ name }_count', {'view': view}, metrics['requests'])
+            )
+        for name, (kind, help_text, collect) in collectors:
+            lines += header(name, kind, help_text)
+            lines += [
+                sample(name, labels, value) for labels, value in collect()
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def header(name, kind, help_text):
+    return [f'# HELP { name } { help_text }', f'# TYPE { name } { kind }']
+
+
+def sample(name, labels, value):
+    label_text = ','.join(
+        f'{ key }="{ escape_label(label) }"' for key, label in labels.items()
+    )
+    return f'{ name }{{{ label_text }}} { value }'
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+registry = Registry()
+
+
+def current():
+    return getattr(local, 'stats', None)
+
+
+@contextmanager
+def collect():
+    stats = RequestStats()
+    local.stats = stats
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        local.stats = None
+
+
+def record_cache(hits=0, misses=0):
+    stats = current()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+original_render = Template.render
+
+
+def timed_render(self, context):
+    stats = current()
+    if stats is None:
+        return original_render(self, context)
+    # Вложенные include тоже вызывают render, считаем только внешний.
+    stats.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return original_render(self, context)
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_time += time.perf_counter() - started
+
+
+def install():
+    Template.render = timed_render
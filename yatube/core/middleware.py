@@ -0,0 +1,77 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from . import budgets, instrumentation, routers
+
+logger = logging.getLogger('yatube.requests')
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrumentation.install()
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        if random.random() < settings.INSTRUMENTATION_SAMPLE_RATE:
+            with instrumentation.collect() as stats:
+                response = self.get_response(request)
+        else:
+            stats = None
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else instrumentation.UNRESOLVED
+        instrumentation.registry.observe(
+            view, duration, response.status_code >= 500, stats
+        )
+        if stats is not None and logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 3),
+                **stats.as_dict(),
+            }, ensure_ascii=False))
+        return response
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_BUDGET_MODE == budgets.OFF:
+            return self.get_response(request)
+        with budgets.record(request) as recorder:
+            response = self.get_response(request)
+        budgets.check(request, recorder)
+        return response
+
+
+class ReplicaPinMiddleware:
+    # После записи клиент ещё REPLICA_PIN_SECONDS читает с основной базы
+    # и видит свои изменения, даже если реплики отстают.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.reset(
+            pinned=routers.PIN_COOKIE in request.COOKIES, request=True
+        )
+        try:
+            response = self.get_response(request)
+            if routers.wrote() and settings.DATABASE_REPLICAS:
+                response.set_cookie(
+                    routers.PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                    samesite='Lax',
+                )
+            return response
+        finally:
+            routers.reset()
@@ -0,0 +1,252 @@
+import base64
+import binascii
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_token(value, pk):
+    raw = f'{ value }{ CURSOR_SEPARATOR }{ pk }'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(token, parse):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value, pk = raw.decode().split(CURSOR_SEPARATOR)
+        value = parse(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+def encode_cursor(pub_date, pk):
+    return encode_token(pub_date.isoformat(), pk)
+
+
+def decode_cursor(token):
+    return decode_token(token, parse_datetime)
+
+
+class CursorPage:
+    def __init__(self, object_list, has_next, has_previous, number=None,
+                 num_pages=None, window=0):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.number = number
+        self.num_pages = num_pages
+        self.window = window
+
+    def __repr__(self):
+        return f'<CursorPage { self.key }>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __contains__(self, item):
+        return item in self.object_list
+
+    @property
+    def key(self):
+        if self.number is not None:
+            return f'page:{ self.number }'
+        if not self.object_list:
+            return 'empty'
+        return f'after:{ self.cursor(self.object_list[0]) }'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def page_range(self):
+        # Первая, последняя и по window страниц вокруг текущей; None на
+        # месте пропуска.
+        if self.number is None or not self.num_pages:
+            return []
+        first = max(self.number - self.window, 1)
+        last = min(self.number + self.window, self.num_pages)
+        pages = list(range(first, last + 1))
+        if first > 1:
+            pages[:0] = [1, None] if first > 2 else [1]
+        if last < self.num_pages:
+            pages += [None, self.num_pages] if (
+                last < self.num_pages - 1
+            ) else [self.num_pages]
+        return pages
+
+    @staticmethod
+    def cursor(obj):
+        return encode_cursor(obj.pub_date, obj.pk)
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.cursor(self.object_list[0])
+
+
+def estimated_count(queryset):
+    # Точный COUNT(*) по всей таблице обходит её целиком, поэтому для
+    # нефильтрованной выборки берём оценку: статистику планировщика в
+    # Postgres, старший первичный ключ в остальных СУБД.
+    if queryset.query.where:
+        return capped_count(queryset)
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # До первого ANALYZE оценки нет (0 или -1), таблица ещё мала.
+        if row and row[0] > 0:
+            return int(row[0])
+        return capped_count(queryset)
+    return queryset.aggregate(last=Max('pk'))['last'] or 0
+
+
+def capped_count(queryset, limit=None):
+    # Дальше limit строк не считаем: пагинатор всё равно добавит страницу,
+    # если за последней известной есть посты.
+    if limit is None:
+        limit = settings.PAGINATOR_COUNT_LIMIT
+    return queryset.values('pk')[:limit].count()
+
+
+class CursorPaginator:
+    page_class = CursorPage
+
+    def __init__(self, queryset, per_page, legacy_pages=0, count=None,
+                 window=0, pk_field='pk'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.legacy_pages = legacy_pages
+        self.count = count
+        self.window = window
+        self.pk_field = pk_field
+
+    def get_page(self, after=None, before=None, page=None):
+        after = decode_cursor(after)
+        if after is not None:
+            return self._after(*after)
+        before = decode_cursor(before)
+        if before is not None:
+            return self._before(*before)
+        return self._number(page)
+
+    def _order(self, queryset, pk_field, descending=True, cursor=None):
+        sign, lookup = ('-', 'lt') if descending else ('', 'gt')
+        if cursor is not None:
+            pub_date, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'pub_date__{ lookup }': pub_date})
+                | Q(pub_date=pub_date, **{f'{ pk_field }__{ lookup }': pk})
+            )
+        return queryset.order_by(f'{ sign }pub_date', f'{ sign }{ pk_field }')
+
+    def _slice(self, offset=0, descending=True, cursor=None):
+        queryset = self._order(
+            self.queryset, self.pk_field, descending, cursor
+        )
+        objects = list(queryset[offset:offset + self.per_page + 1])
+        return objects[:self.per_page], len(objects) > self.per_page
+
+    def rows(self, limit=None):
+        return capped_count(self.queryset, limit)
+
+    def _num_pages(self):
+        if self.count is None:
+            return None
+        total = self.count() if callable(self.count) else self.count
+        return max(-(-total // self.per_page), 1)
+
+    def _number(self, page, num_pages=None):
+        try:
+            number = int(page)
+        except (TypeError, ValueError):
+            number = 1
+        if num_pages is None:
+            num_pages = self._num_pages()
+        number = min(max(number, 1), num_pages or max(self.legacy_pages, 1))
+        objects, has_next = self._slice((number - 1) * self.per_page)
+        if not objects and number > 1:
+            # Как и Paginator.get_page, отдаём последнюю страницу, но
+            # считаем только строки до запрошенной: число страниц могло
+            # быть оценкой.
+            rows = self.rows(number * self.per_page)
+            last = max(-(-rows // self.per_page), 1)
+            return self._number(last, last if num_pages else None)
+        if num_pages:
+            num_pages = number if not has_next else max(num_pages, number + 1)
+        return self.page_class(
+            objects, has_next, number > 1, number, num_pages, self.window
+        )
+
+    def _after(self, pub_date, pk):
+        objects, has_next = self._slice(cursor=(pub_date, pk))
+        return self.page_class(objects, has_next, True)
+
+    def _before(self, pub_date, pk):
+        objects, has_previous = self._slice(
+            descending=False, cursor=(pub_date, pk)
+        )
+        objects.reverse()
+        if not has_previous:
+            return self._number(1)
+        return self.page_class(objects, True, has_previous)
+
+
+class MergedCursorPaginator(CursorPaginator):
+    # Листает несколько выборок как одну по общему курсору (pub_date, pk).
+    # sources — тройки (выборка, поле ключа, convert); convert приводит
+    # строки выборки к общему виду, None — оставить как есть.
+    def __init__(self, sources, per_page, **kwargs):
+        super().__init__(None, per_page, **kwargs)
+        self.sources = sources
+
+    def _slice(self, offset=0, descending=True, cursor=None):
+        limit = offset + self.per_page + 1
+        merged = heapq.merge(*(
+            map(convert or (lambda obj: obj), self._order(
+                queryset, pk_field, descending, cursor
+            )[:limit])
+            for queryset, pk_field, convert in self.sources
+        ), key=lambda obj: (obj.pub_date, obj.pk), reverse=descending)
+        objects = list(islice(merged, offset, limit))
+        return objects[:self.per_page], len(objects) > self.per_page
+
+    def rows(self, limit=None):
+        return sum(
+            capped_count(queryset, limit) for queryset, *_ in self.sources
+        )
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import connections
+
+OPENED = 'opened'
+REUSED = 'reused'
+DROPPED = 'dropped'
+EXPIRED = 'expired'
+
+
+class ConnectionStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = Counter()
+
+    def record(self, alias, event):
+        with self.lock:
+            self.events[alias, event] += 1
+
+    def get(self, alias, event):
+        with self.lock:
+            return self.events[alias, event]
+
+    def collect(self):
+        with self.lock:
+            return [
+                ({'alias': alias, 'event': event}, count)
+                for (alias, event), count in sorted(self.events.items())
+            ]
+
+
+stats = ConnectionStats()
+
+
+def ping(connection, error):
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except error:
+        return False
+    return True
+
+
+def check(connection):
+    # Постоянное соединение могло оборваться, пока ждало запроса: сервер
+    # перезапустили или закрыл простаивающих клиентов. Проверяем его до
+    # первого запроса, а не ловим ошибку посреди view.
+    if connection.connection is None or connection.in_atomic_block:
+        return True
+    if (not settings.DB_HEALTH_CHECKS
+            or ping(connection.connection, connection.Database.Error)):
+        stats.record(connection.alias, REUSED)
+        return True
+    stats.record(connection.alias, DROPPED)
+    # Оборванное соединение не должно вернуться в пул.
+    connection.errors_occurred = True
+    try:
+        connection.close()
+    except connection.Database.Error:
+        connection.connection = None
+    return False
+
+
+def schedule_checks(**kwargs):
+    # Сам запрос к БД откладываем до первого использования соединения:
+    # страницы из кэша и нетронутые реплики проверка не задевает.
+    for connection in connections.all():
+        connection.health_check_needed = True
+
+
+def count_opened(sender, connection, **kwargs):
+    if not getattr(connection, 'reused_from_pool', False):
+        stats.record(connection.alias, OPENED)
+
+
+class ConnectionPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = deque()
+
+    def acquire(self):
+        with self.lock:
+            return self.idle.pop() if self.idle else (None, None)
+
+    def release(self, connection, opened):
+        with self.lock:
+            if len(self.idle) >= settings.DB_POOL_SIZE:
+                return False
+            self.idle.append((connection, opened))
+            return True
+
+    def clear(self):
+        with self.lock:
+            idle, self.idle = list(self.idle), deque()
+        for connection, _ in idle:
+            connection.close()
+
+    def __len__(self):
+        return len(self.idle)
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias):
+    with pools_lock:
+        return pools.setdefault(alias, ConnectionPool())
+
+
+def collect_idle():
+    with pools_lock:
+        return [
+            ({'alias': alias}, len(pool))
+            for alias, pool in sorted(pools.items())
+        ]
+
+
+class HealthCheckedDatabaseWrapperMixin:
+    health_check_needed = False
+
+    def _cursor(self, name=None):
+        # Не ensure_connection: его дёргает и close_old_connections в
+        # начале запроса, а проверять нужно перед первым SQL.
+        if self.health_check_needed:
+            self.health_check_needed = False
+            check(self)
+        return super()._cursor(name)
+
+
+class PooledDatabaseWrapperMixin:
+    # Соединения Django привязаны к потоку и закрываются вместе с ним.
+    # В многопоточном сервере закрытое соединение возвращается в общий
+    # пул процесса, и следующий поток берёт его вместо нового подключения.
+    reused_from_pool = False
+    opened = None
+
+    def expired(self, opened):
+        # CONN_MAX_AGE считаем от открытия соединения, а не от того, как
+        # его взял очередной поток: иначе оно жило бы в пуле вечно.
+        max_age = self.settings_dict['CONN_MAX_AGE']
+        return max_age is not None and time.monotonic() - opened >= max_age
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias)
+        while True:
+            connection, opened = pool.acquire()
+            if connection is None:
+                self.reused_from_pool = False
+                self.opened = time.monotonic()
+                return super().get_new_connection(conn_params)
+            if self.expired(opened):
+                stats.record(self.alias, EXPIRED)
+            elif ping(connection, self.Database.Error):
+                self.reused_from_pool = True
+                self.opened = opened
+                stats.record(self.alias, REUSED)
+                return connection
+            else:
+                stats.record(self.alias, DROPPED)
+            self.discard(connection)
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except self.Database.Error:
+            pass
+
+    def _close(self):
+        if (self.connection is None or self.errors_occurred
+                or self.in_atomic_block or not self.get_autocommit()
+                or self.expired(self.opened)):
+            return super()._close()
+        if not get_pool(self.alias).release(self.connection, self.opened):
+            return super()._close()
@@ -0,0 +1,41 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+
+state = threading.local()
+
+
+def reset(pinned=False, request=False):
+    # С реплик читают только потоки, обрабатывающие запрос: команды,
+    # фоновые задачи и оболочка работают с основной базой.
+    state.pinned = pinned
+    state.wrote = False
+    state.request = request
+
+
+def wrote():
+    return getattr(state, 'wrote', False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        # Внутри транзакции и после записи читаем с основной базы: реплика
+        # может ещё не получить изменения.
+        if (not replicas or not getattr(state, 'request', False)
+                or getattr(state, 'pinned', False)
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state.pinned = True
+        state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from . import budgets
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_MODE = budgets.RAISE
+        # Данные TestCase живут в незакоммиченной транзакции основной базы,
+        # реплики их не видят. Маршрутизацию проверяют отдельные тесты.
+        settings.DATABASE_REPLICAS = []
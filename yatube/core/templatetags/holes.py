@@ -0,0 +1,15 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core import holes
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **kwargs):
+    # При сборке страницы для общего кэша вместо личных фрагментов
+    # оставляем метки, которые заполняются на каждый запрос.
+    if context.get('page_cache'):
+        return mark_safe(holes.marker(name, kwargs))
+    return holes.render(context['request'], name, kwargs)
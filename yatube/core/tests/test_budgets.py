@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+from posts.urls import urlpatterns
+
+from .. import budgets
+
+INDEX_URL = reverse('posts:index')
+VIEW = 'posts:index'
+USERNAME = 'Author'
+USERNAME_2 = 'Reader'
+SLUG = 'test-slug'
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_posts_views_declare_budgets(self):
+        for pattern in urlpatterns:
+            with self.subTest(view=pattern.name):
+                self.assertIsInstance(
+                    getattr(pattern.callback, 'query_budget', None), int
+                )
+
+    def scenarios(self, post, other_post, author, reader):
+        profile_url = reverse('posts:profile', args=[USERNAME])
+        post_url = reverse('posts:post_detail', args=[post.pk])
+        return [
+            ('get', INDEX_URL, None, None),
+            ('get', INDEX_URL, {'page': 2}, reader),
+            ('get', reverse('posts:group_list', args=[SLUG]), None, None),
+            ('get', reverse('posts:group_list', args=[SLUG]), None, reader),
+            ('get', profile_url, None, None),
+            ('get', profile_url, None, reader),
+            ('get', post_url, None, None),
+            ('get', post_url, None, reader),
+            ('get', reverse('posts:post_search'), {'q': 'текст'}, reader),
+            ('get', reverse('posts:follow_index'), None, reader),
+            ('get', reverse('posts:post_create'), None, author),
+            ('post', reverse('posts:post_create'),
+             {'text': 'Новый пост', 'group': post.group_id}, author),
+            ('get', reverse('posts:post_edit', args=[post.pk]), None, author),
+            ('post', reverse('posts:post_edit', args=[post.pk]),
+             {'text': 'Правка', 'group': post.group_id}, author),
+            ('post', reverse('posts:add_comment', args=[post.pk]),
+             {'text': 'Коммент'}, reader),
+            ('get', reverse('posts:profile_unfollow', args=[USERNAME]),
+             None, reader),
+            ('get', reverse('posts:profile_follow', args=[USERNAME]),
+             None, reader),
+            ('get', reverse('posts:group_create'), None, author),
+            ('post', reverse('posts:group_create'),
+             {'title': 'Группа', 'slug': 'new', 'description': 'Описание'},
+             author),
+            ('get', reverse('posts:delete_post', args=[post.pk]), None,
+             author),
+            ('get', reverse('posts:delete_post', args=[other_post.pk]), None,
+             author),
+        ]
+
+    @override_settings(QUERY_BUDGET_MODE=budgets.RAISE)
+    def test_views_fit_budgets(self):
+        author = User.objects.create_user(username=USERNAME)
+        reader = User.objects.create_user(username=USERNAME_2)
+        group = Group.objects.create(
+            title='Тест заголовок', slug=SLUG, description='Тест описание'
+        )
+        posts = [
+            Post.objects.create(
+                text=f'Тест текст { index }', author=author, group=group
+            )
+            for index in range(15)
+        ]
+        Comment.objects.bulk_create(
+            Comment(post=posts[-1], author=reader, text='Коммент')
+            for _ in range(5)
+        )
+        Follow.objects.create(user=reader, author=author)
+        clients = {None: self.guest_client}
+        for user in (author, reader):
+            # Бюджеты рассчитаны на устоявшееся состояние, когда счётчики
+            # автора уже заведены.
+            AuthorStats.objects.for_user(user)
+            clients[user] = Client()
+            clients[user].force_login(user)
+        visited = set()
+        for method, url, data, user in self.scenarios(
+            posts[-1], posts[0], author, reader
+        ):
+            with self.subTest(method=method, url=url, user=user):
+                cache.clear()
+                response = getattr(clients[user], method)(url, data or {})
+                self.assertLess(response.status_code, 400)
+                visited.add(resolve(url).url_name)
+        self.assertEqual(visited, {pattern.name for pattern in urlpatterns})
+
+    def test_test_runner_raises_on_violation(self):
+        with override_settings(QUERY_BUDGETS={VIEW: 0}):
+            with self.assertLogs('yatube.queries', 'WARNING'):
+                with self.assertRaises(budgets.QueryBudgetExceeded) as error:
+                    self.guest_client.get(INDEX_URL)
+        report = str(error.exception)
+        self.assertRegex(
+            report, rf'{ VIEW }: \d+ запросов к БД при бюджете 0'
+        )
+        self.assertIn('FROM "posts_post"', report)
+        self.assertIn('posts/views.py', report)
+
+    @override_settings(QUERY_BUDGET_MODE=budgets.LOG, QUERY_BUDGETS={VIEW: 0})
+    def test_staging_logs_violation(self):
+        with self.assertLogs('yatube.queries', 'WARNING') as logs:
+            response = self.guest_client.get(INDEX_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('FROM "posts_post"', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_MODE=budgets.OFF, QUERY_BUDGETS={VIEW: 0})
+    def test_budgets_are_ignored_when_off(self):
+        self.assertEqual(self.guest_client.get(INDEX_URL).status_code, 200)
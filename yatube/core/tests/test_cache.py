@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..cache import (POSTS_GENERATION, bump_generation, generation_key,
+                     get_generation)
+
+User = get_user_model()
+
+CACHE_STATS_URL = reverse('core:cache_stats')
+
+
+class InstrumentedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='Staff', is_staff=True)
+        cls.user = User.objects.create_user(username='NoName')
+        cls.staff_client = Client(REMOTE_ADDR='10.0.0.1')
+        cls.staff_client.force_login(cls.staff)
+        cls.authorized_client = Client(REMOTE_ADDR='10.0.0.1')
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hits_and_misses_are_counted(self):
+        before = cache.stats.as_dict()
+        cache.get('missing')
+        cache.set('present', 1)
+        cache.get('present')
+        cache.get_many(['present', 'missing'])
+        after = cache.stats.as_dict()
+        self.assertEqual(after['hits'] - before['hits'], 2)
+        self.assertEqual(after['misses'] - before['misses'], 2)
+
+    def test_generation_is_bumped(self):
+        generation = get_generation()
+        bump_generation()
+        self.assertEqual(get_generation(), generation + 1)
+
+    def test_evicted_generation_does_not_repeat(self):
+        for evict in (get_generation, bump_generation):
+            with self.subTest(evict=evict.__name__):
+                generation = bump_generation()
+                cache.delete(generation_key(POSTS_GENERATION))
+                self.assertGreater(evict(), generation)
+
+    def test_stats_endpoint_is_internal(self):
+        self.assertEqual(
+            self.authorized_client.get(CACHE_STATS_URL).status_code, 403
+        )
+        response = self.staff_client.get(CACHE_STATS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.json()['backends']['default'])
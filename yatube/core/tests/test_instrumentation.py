@@ -0,0 +1,71 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..instrumentation import registry
+
+User = get_user_model()
+
+INDEX_URL = reverse('posts:index')
+METRICS_URL = reverse('core:metrics')
+VIEW = 'posts:index'
+
+
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.user = User.objects.create_user(username='NoName')
+        cls.external_client = Client(REMOTE_ADDR='10.0.0.1')
+        cls.external_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_sampled_request_is_measured_and_logged(self):
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            self.guest_client.get(INDEX_URL)
+        metrics = registry.views[VIEW]
+        self.assertEqual(metrics.requests, 1)
+        self.assertEqual(metrics.sampled, 1)
+        self.assertGreater(metrics.db_queries, 0)
+        self.assertGreater(metrics.template_time, 0)
+        self.assertGreater(metrics.cache_misses, 0)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], VIEW)
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['db_queries'], metrics.db_queries)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_request_is_only_counted(self):
+        self.guest_client.get(INDEX_URL)
+        metrics = registry.views[VIEW]
+        self.assertEqual(metrics.requests, 1)
+        self.assertEqual(metrics.sampled, 0)
+        self.assertEqual(metrics.db_queries, 0)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_metrics_endpoint_exports_prometheus_text(self):
+        self.guest_client.get(INDEX_URL)
+        response = self.guest_client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        for line in (
+            '# TYPE yatube_requests_total counter',
+            f'yatube_requests_total{{view="{ VIEW }"}} 1',
+            '# TYPE yatube_request_duration_seconds histogram',
+            f'yatube_request_duration_seconds_bucket{{view="{ VIEW }",'
+            f'le="+Inf"}} 1',
+            f'yatube_request_duration_seconds_count{{view="{ VIEW }"}} 1',
+        ):
+            with self.subTest(line=line):
+                self.assertContains(response, line)
+        self.assertEqual(
+            self.external_client.get(METRICS_URL).status_code, 403
+        )
@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from .. import instrumentation, pool
+from ..backends.sqlite3.base import DatabaseWrapper as PooledDatabaseWrapper
+
+METRICS_URL = reverse('core:metrics')
+
+
+@override_settings(DB_HEALTH_CHECKS=True, DB_POOL_SIZE=1)
+class ConnectionPoolTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.alias = self.id()
+        self.addCleanup(pool.get_pool(self.alias).clear)
+
+    def wrapper(self, wrapper_class=PooledDatabaseWrapper, max_age=60):
+        settings_dict = dict(
+            connections[DEFAULT_DB_ALIAS].settings_dict,
+            ENGINE='core.backends.sqlite3',
+            NAME=os.path.join(self.directory, 'pool.sqlite3'),
+            CONN_MAX_AGE=max_age,
+        )
+        return wrapper_class(settings_dict, alias=self.alias)
+
+    def query(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            return cursor.fetchone()
+
+    def events(self, event):
+        return pool.stats.get(self.alias, event)
+
+    def test_closed_connection_is_reused(self):
+        first = self.wrapper()
+        self.query(first)
+        raw = first.connection
+        first.close()
+        self.assertEqual(len(pool.get_pool(self.alias)), 1)
+        second = self.wrapper()
+        self.assertEqual(self.query(second), (1,))
+        self.assertIs(second.connection, raw)
+        self.assertEqual(self.events(pool.OPENED), 1)
+        self.assertEqual(self.events(pool.REUSED), 1)
+        second.close()
+
+    def test_connection_moves_between_threads(self):
+        raws = []
+
+        def serve():
+            wrapper = self.wrapper()
+            self.query(wrapper)
+            raws.append(wrapper.connection)
+            wrapper.close()
+        for _ in range(3):
+            thread = threading.Thread(target=serve)
+            thread.start()
+            thread.join()
+        self.assertEqual(len({id(raw) for raw in raws}), 1)
+        self.assertEqual(self.events(pool.OPENED), 1)
+        self.assertEqual(self.events(pool.REUSED), 2)
+
+    def test_dropped_connection_is_replaced(self):
+        first = self.wrapper()
+        self.query(first)
+        raw = first.connection
+        first.close()
+        # Соединение обрывается, пока лежит в пуле.
+        raw.close()
+        second = self.wrapper()
+        self.assertEqual(self.query(second), (1,))
+        self.assertIsNot(second.connection, raw)
+        self.assertEqual(self.events(pool.DROPPED), 1)
+        self.assertEqual(self.events(pool.OPENED), 2)
+        second.close()
+
+    def test_pool_size_and_broken_connections(self):
+        first, second = self.wrapper(), self.wrapper()
+        self.query(first)
+        self.query(second)
+        raw = second.connection
+        first.close()
+        second.close()
+        self.assertEqual(len(pool.get_pool(self.alias)), 1)
+        with self.assertRaises(second.Database.ProgrammingError):
+            raw.cursor()
+        third = self.wrapper()
+        self.query(third)
+        third.errors_occurred = True
+        third.close()
+        self.assertEqual(len(pool.get_pool(self.alias)), 0)
+
+    def test_max_age_counts_from_opening(self):
+        first = self.wrapper()
+        self.query(first)
+        raw = first.connection
+        first.close()
+        opened = first.opened
+        with mock.patch('core.pool.time.monotonic', return_value=opened + 59):
+            second = self.wrapper()
+            self.query(second)
+            self.assertIs(second.connection, raw)
+            second.close()
+        self.assertEqual(len(pool.get_pool(self.alias)), 1)
+        with mock.patch('core.pool.time.monotonic', return_value=opened + 60):
+            third = self.wrapper()
+            self.query(third)
+            self.assertIsNot(third.connection, raw)
+        self.assertEqual(self.events(pool.EXPIRED), 1)
+        third.close()
+
+    def test_connection_over_max_age_is_not_pooled(self):
+        for max_age in (0, 60):
+            with self.subTest(max_age=max_age):
+                wrapper = self.wrapper(max_age=max_age)
+                self.query(wrapper)
+                wrapper.opened -= 60
+                wrapper.close()
+                self.assertEqual(len(pool.get_pool(self.alias)), 0)
+        unlimited = self.wrapper(max_age=None)
+        self.query(unlimited)
+        unlimited.opened -= 60 * 60 * 24
+        unlimited.close()
+        self.assertEqual(len(pool.get_pool(self.alias)), 1)
+
+    def test_persistent_connection_health_check(self):
+        wrapper = self.wrapper(DatabaseWrapper)
+        self.query(wrapper)
+        self.assertTrue(pool.check(wrapper))
+        self.assertEqual(self.events(pool.REUSED), 1)
+        wrapper.connection.close()
+        self.assertFalse(pool.check(wrapper))
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(self.events(pool.DROPPED), 1)
+        self.assertEqual(self.query(wrapper), (1,))
+        self.assertEqual(self.events(pool.OPENED), 2)
+        with override_settings(DB_HEALTH_CHECKS=False):
+            self.assertTrue(pool.check(wrapper))
+        wrapper.close()
+
+    def test_health_check_runs_on_first_use_in_request(self):
+        wrapper = self.wrapper()
+        self.query(wrapper)
+        with mock.patch.object(connections, 'all', return_value=[wrapper]):
+            with mock.patch('core.pool.ping') as ping:
+                request_started.send(sender=None)
+            ping.assert_not_called()
+            wrapper.connection.close()
+            self.assertEqual(self.query(wrapper), (1,))
+            self.assertEqual(self.query(wrapper), (1,))
+        self.assertEqual(self.events(pool.DROPPED), 1)
+        self.assertEqual(self.events(pool.OPENED), 2)
+        wrapper.close()
+
+    def test_metrics_are_exported(self):
+        wrapper = self.wrapper()
+        self.query(wrapper)
+        wrapper.close()
+        text = instrumentation.registry.render()
+        self.assertIn(
+            '# TYPE yatube_db_connection_events_total counter', text
+        )
+        self.assertIn(
+            f'yatube_db_connection_events_total{{alias="{ self.alias }",'
+            f'event="opened"}} 1',
+            text,
+        )
+        self.assertIn(f'yatube_db_pool_idle{{alias="{ self.alias }"}} 1', text)
+        self.assertEqual(
+            Client(REMOTE_ADDR='127.0.0.1').get(METRICS_URL).status_code, 200
+        )
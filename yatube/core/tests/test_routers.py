@@ -0,0 +1,123 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Token
+from posts.models import Post, User
+
+from .. import routers
+from ..middleware import ReplicaPinMiddleware
+
+REPLICA = 'replica1'
+REPLICAS = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+BULK_URL = reverse('api:posts_bulk')
+FEED_URL = reverse('api:index')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        routers.reset(request=True)
+        self.addCleanup(routers.reset)
+        self.router = routers.ReplicaRouter()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Post), REPLICA)
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+
+    def test_reads_outside_requests_use_primary(self):
+        routers.reset()
+        self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+
+    def test_write_pins_reads_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Post), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+        routers.reset(request=True)
+        self.assertEqual(self.router.db_for_read(Post), REPLICA)
+
+    def pass_through(self, get_response, **cookies):
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies)
+        return ReplicaPinMiddleware(get_response)(request)
+
+    def test_middleware_sets_pin_after_write(self):
+        def write(request):
+            self.router.db_for_write(Post)
+            return HttpResponse()
+        response = self.pass_through(write)
+        pin = response.cookies[routers.PIN_COOKIE]
+        self.assertEqual(pin['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertEqual(self.router.db_for_read(Post), DEFAULT_DB_ALIAS)
+        response = self.pass_through(lambda request: HttpResponse())
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_primary(self):
+        databases = []
+
+        def read(request):
+            databases.append(self.router.db_for_read(Post))
+            return HttpResponse()
+        self.pass_through(read, **{routers.PIN_COOKIE: '1'})
+        self.pass_through(read)
+        self.assertEqual(databases, [DEFAULT_DB_ALIAS, REPLICA])
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaCommandTests(TestCase):
+    def test_management_command_reads_from_primary(self):
+        user = User.objects.create_user(username='NoName')
+        Post.objects.create(text='Тест текст', author=user)
+        routers.reset()
+        out = StringIO()
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            call_command('recount_author_stats', dry_run=True, stdout=out)
+        self.assertIn('Создано: 0, исправлено: 1', out.getvalue())
+        self.assertTrue(any(
+            '"posts_post"' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+
+@skipUnless(REPLICAS, 'Реплики не настроены: задайте DB_REPLICA_NAMES')
+class ReplicaReadYourWritesTests(TransactionTestCase):
+    # Реплика здесь — отдельный файл SQLite без репликации, поэтому
+    # видно, с какой базы прочитан ответ.
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        for alias in [DEFAULT_DB_ALIAS] + REPLICAS:
+            user = User.objects.db_manager(alias).create_user(
+                username='Importer', id=1
+            )
+            Token.objects.using(alias).create(key='k' * 40, user=user)
+
+    def feed(self, client):
+        return [row['text'] for row in client.get(FEED_URL).json()['results']]
+
+    def test_writer_reads_own_posts(self):
+        writer = Client(HTTP_AUTHORIZATION=f'Token { "k" * 40 }')
+        reader = Client()
+        with override_settings(DATABASE_REPLICAS=REPLICAS):
+            response = writer.post(
+                BULK_URL, json.dumps([{'text': 'Свежий пост'}]),
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, HTTPStatus.CREATED)
+            self.assertIn(routers.PIN_COOKIE, response.cookies)
+            self.assertEqual(self.feed(writer), ['Свежий пост'])
+            self.assertEqual(self.feed(reader), [])
+        self.assertEqual(Post.objects.using(DEFAULT_DB_ALIAS).count(), 1)
+        self.assertEqual(Post.objects.using(REPLICAS[0]).count(), 0)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('stats/cache/',
+         views.cache_stats,
+         name='cache_stats'),
+    path('metrics/',
+         views.metrics,
+         name='metrics'),
+]
@@ -1,5 +1,14 @@
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 
+from . import instrumentation
+from .cache_backends import InstrumentedCache
+from .decorators import internal_only
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +24,24 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+@internal_only
+def cache_stats(request):
+    backends = {}
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        if isinstance(cache, InstrumentedCache):
+            backends[alias] = {
+                'backend': cache.backend,
+                **cache.stats.as_dict(),
+            }
+    return JsonResponse({'pid': os.getpid(), 'backends': backends})
+
+
+@internal_only
+def metrics(request):
+    return HttpResponse(
+        instrumentation.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import AuthorStats, Comment, Follow, Group, Post, ThumbnailJob
 
 
 @admin.register(Post)
@@ -40,3 +40,23 @@ class CommentAdmin(admin.ModelAdmin):
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user',
                     'author',)
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('user',
+                    'posts_count',
+                    'following_count',
+                    'followers_count',)
+    search_fields = ('user__username',)
+
+
+@admin.register(ThumbnailJob)
+class ThumbnailJobAdmin(admin.ModelAdmin):
+    list_display = ('pk',
+                    'post',
+                    'status',
+                    'attempts',
+                    'created',
+                    'updated',)
+    list_filter = ('status',)
@@ -0,0 +1,39 @@
+def page_key(page, modified):
+    return (
+        [(obj.pk, modified(obj)) for obj in page],
+        page.has_next(),
+        page.has_previous(),
+    )
+
+
+def stats_key(stats):
+    return stats.posts_count, stats.following_count, stats.followers_count
+
+
+def feed_state(context):
+    page = context['page_obj']
+    return page_key(page, lambda post: post.updated), page.num_pages
+
+
+def index_state(context):
+    return feed_state(context)
+
+
+def group_state(context):
+    # Правка группы обновляет её посты, но у пустой группы их нет.
+    group = context['group']
+    return feed_state(context), group.title, group.description
+
+
+def profile_state(context):
+    return feed_state(context), stats_key(context['stats'])
+
+
+def post_state(context):
+    post = context['post']
+    comments = context['comments']
+    return (
+        post.updated,
+        page_key(comments, lambda comment: comment.pub_date),
+        stats_key(context['stats']),
+    )
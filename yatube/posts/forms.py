@@ -9,6 +9,45 @@ class PostForm(forms.ModelForm):
         fields = ('text', 'group', 'image',)
 
 
+class GroupSlugField(forms.Field):
+    default_error_messages = {
+        'invalid_choice': 'Группы «%(value)s» не существует.',
+    }
+
+    def __init__(self, groups, **kwargs):
+        super().__init__(**kwargs)
+        self.groups = groups
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.groups[value]
+        except (KeyError, TypeError):
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+
+class BulkPostForm(PostForm):
+    # Группы передаются по slug и берутся из заранее загруженного словаря:
+    # ModelChoiceField и проверка модели сходили бы в базу за каждым постом.
+    group = GroupSlugField(groups={}, required=False)
+
+    class Meta(PostForm.Meta):
+        fields = ('text', 'image',)
+
+    def __init__(self, *args, groups, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].groups = groups
+
+    def save(self, commit=True):
+        self.instance.group = self.cleaned_data['group']
+        return super().save(commit)
+
+
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
@@ -0,0 +1,21 @@
+from core import holes
+
+from .models import Follow
+
+
+@holes.register('switcher', 'posts/includes/switcher.html')
+def switcher(request, **active):
+    return active
+
+
+@holes.register('follow_button', 'posts/includes/follow_button.html')
+def follow_button(request, username):
+    user = request.user
+    show = user.is_authenticated and user.username != username
+    return {
+        'username': username,
+        'show': show,
+        'following': show and Follow.objects.filter(
+            user=user, author__username=username
+        ).exists(),
+    }
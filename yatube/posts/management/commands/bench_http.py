@@ -0,0 +1,298 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from http.cookies import SimpleCookie
+from io import StringIO
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts import seed
+from posts.models import Follow, Group, Post, User
+
+TRANSPORTS = ('client', 'wsgi')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def reset(self):
+        with self.lock:
+            count, self.count = self.count, 0
+        return count
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+class WSGITransport:
+    def __init__(self):
+        self.server = make_server(
+            '127.0.0.1', 0, get_wsgi_application(),
+            handler_class=QuietHandler,
+        )
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        self.opener = urllib.request.build_opener(NoRedirect)
+        self.base = f'http://127.0.0.1:{ self.server.server_port }'
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def login(self, user):
+        client = Client()
+        client.force_login(user)
+        cookies = SimpleCookie()
+        cookies[settings.SESSION_COOKIE_NAME] = client.cookies[
+            settings.SESSION_COOKIE_NAME
+        ].value
+        status, body, headers = self.request('GET', reverse(
+            'posts:post_create'
+        ), session=cookies)
+        received = SimpleCookie()
+        for header in headers.get_all('Set-Cookie') or []:
+            received.load(header)
+        cookies[settings.CSRF_COOKIE_NAME] = received[
+            settings.CSRF_COOKIE_NAME
+        ].value
+        return cookies
+
+    def request(self, method, path, data=None, session=None):
+        headers = {}
+        if session:
+            headers['Cookie'] = '; '.join(
+                f'{ key }={ morsel.value }' for key, morsel in session.items()
+            )
+            if settings.CSRF_COOKIE_NAME in session:
+                headers['X-CSRFToken'] = session[
+                    settings.CSRF_COOKIE_NAME
+                ].value
+        request = urllib.request.Request(
+            self.base + path,
+            data=urlencode(data).encode() if data is not None else None,
+            headers=headers,
+            method=method,
+        )
+        try:
+            with self.opener.open(request) as response:
+                return response.status, response.read(), response.headers
+        except HTTPError as error:
+            return error.code, error.read(), error.headers
+
+
+class ClientTransport:
+    def close(self):
+        pass
+
+    def login(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def request(self, method, path, data=None, session=None):
+        client = session or Client()
+        if method == 'POST':
+            response = client.post(path, data)
+        else:
+            response = client.get(path)
+        return response.status_code, response.content, response
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку, число запросов к БД и объём ответов '
+            'страниц постов на сгенерированных данных')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', choices=seed.PROFILES, default=['small'],
+        )
+        parser.add_argument(
+            '--transports', nargs='+', choices=TRANSPORTS,
+            default=list(TRANSPORTS),
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэш перед каждым запросом',
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта')
+
+    def scenarios(self):
+        author = Post.objects.values('author').annotate(
+            total=Count('pk')
+        ).order_by('-total', 'author')[0]['author']
+        reader = Follow.objects.values('user').annotate(
+            total=Count('pk')
+        ).order_by('-total', 'user')[0]['user']
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total', 'pk')[0]
+        post = Post.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total', 'pk')[0]
+        author = User.objects.get(pk=author)
+        reader = User.objects.get(pk=reader)
+        return [
+            ['index', 'GET', reverse('posts:index'), None, None],
+            ['group_list', 'GET',
+             reverse('posts:group_list', args=[group.slug]), None, None],
+            ['profile', 'GET',
+             reverse('posts:profile', args=[author.username]), None, None],
+            ['post_detail', 'GET',
+             reverse('posts:post_detail', args=[post.pk]), None, None],
+            ['follow_index', 'GET', reverse('posts:follow_index'), None,
+             reader],
+            ['add_comment', 'POST',
+             reverse('posts:add_comment', args=[post.pk]),
+             {'text': 'Комментарий для замера'}, reader],
+            ['post_create', 'POST', reverse('posts:post_create'),
+             {'text': 'Пост для замера'}, author],
+        ]
+
+    def measure(self, transport, scenario, options, counter):
+        name, method, path, data, user = scenario
+        session = transport.login(user) if user else None
+        cache = caches['default']
+        timings, queries, sizes, statuses = [], [], [], set()
+        for _ in range(options['repeat']):
+            if options['cold']:
+                cache.clear()
+            counter.reset()
+            started = time.perf_counter()
+            status, body, _ = transport.request(method, path, data, session)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.reset())
+            sizes.append(len(body))
+            statuses.add(status)
+        return {
+            'view': name,
+            'method': method,
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': round(sum(queries) / len(queries), 2),
+            'bytes': round(sum(sizes) / len(sizes)),
+        }
+
+    def run_size(self, size, options, counter):
+        call_command(
+            'seed_yatube', profile=size, seed=options['seed'],
+            stdout=StringIO(),
+        )
+        caches['default'].clear()
+        results = []
+        transports = {
+            name: WSGITransport() if name == 'wsgi' else ClientTransport()
+            for name in options['transports']
+        }
+        try:
+            # Запросы на запись меняют данные, поэтому каждый сценарий
+            # прогоняем через все транспорты, прежде чем идти дальше.
+            for scenario in self.scenarios():
+                for name, transport in transports.items():
+                    result = self.measure(
+                        transport, scenario, options, counter
+                    )
+                    results.append(dict(result, size=size, transport=name))
+                    self.stderr.write(
+                        f'{ size } { name } { result["view"] }: '
+                        f'p50 { result["p50_ms"] } мс, '
+                        f'{ result["queries"] } запросов'
+                    )
+        finally:
+            for transport in transports.values():
+                transport.close()
+        return results
+
+    def handle(self, *args, **options):
+        counter = QueryCounter()
+        connection_created.connect(counter.install)
+        results = []
+        directory = tempfile.mkdtemp()
+        cache_settings = dict(settings.CACHES['default'], KEY_PREFIX='bench')
+        if cache_settings.get(
+            'WRAPPED_BACKEND', cache_settings['BACKEND']
+        ).endswith('FileBasedCache'):
+            cache_settings['LOCATION'] = os.path.join(directory, 'cache')
+        for size in options['sizes']:
+            # Данные генерируем в отдельной тестовой базе, которую
+            # видят и клиент, и поток WSGI-сервера.
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    directory, f'bench-{ size }.sqlite3'
+                )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            for alias in connections:
+                connections[alias].close()
+            try:
+                with override_settings(
+                    ALLOWED_HOSTS=['testserver', '127.0.0.1'],
+                    MEDIA_ROOT=directory,
+                    CACHES={'default': cache_settings},
+                    THUMBNAIL_ASYNC=False,
+                ):
+                    results.extend(self.run_size(size, options, counter))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        connection_created.disconnect(counter.install)
+        shutil.rmtree(directory, ignore_errors=True)
+        report = json.dumps({
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'cold': options['cold'],
+            'seed': options['seed'],
+            'results': results,
+        }, ensure_ascii=False, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file_:
+                file_.write(report + '\n')
+        else:
+            self.stdout.write(report)
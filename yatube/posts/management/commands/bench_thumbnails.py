@@ -0,0 +1,68 @@
+import os
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.parsers import parse_geometry
+
+from posts import thumbnails
+
+LEGACY_GEOMETRY = '960x339'
+LEGACY_OPTIONS = {'crop': 'center', 'upscale': True, 'format': 'PNG'}
+
+
+def render_size(source_image, geometry_string, options):
+    options = dict(default.backend.default_options, **options)
+    ratio = default.engine.get_image_ratio(source_image, options)
+    image = default.engine.create(
+        source_image, parse_geometry(geometry_string, ratio), options
+    )
+    return len(default.engine._get_raw_data(
+        image,
+        options['format'],
+        options['quality'],
+        image_info=default.engine.get_image_info(source_image),
+        progressive=options.get('progressive', False),
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает объём миниатюр постов на страницу: '
+            'PNG против WebP/JPEG со srcset')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.MEDIA_ROOT, settings.UPLOAD_TO),
+        )
+
+    def handle(self, *args, **options):
+        sizes = {'PNG 960': []}
+        for name in sorted(os.listdir(options['path'])):
+            with open(os.path.join(options['path'], name), 'rb') as file_:
+                source = ImageFile(file_)
+                source_image = default.engine.get_image(source)
+            sizes['PNG 960'].append(
+                render_size(source_image, LEGACY_GEOMETRY, LEGACY_OPTIONS)
+            )
+            for _, width, geometry, variant in thumbnails.variants():
+                sizes.setdefault(
+                    f'{ variant["format"] } { width }', []
+                ).append(render_size(source_image, geometry, variant))
+        if not sizes['PNG 960']:
+            self.stdout.write('Нет изображений для сравнения')
+            return
+        self.stdout.write(
+            f'Изображений: { len(sizes["PNG 960"]) }, '
+            f'постов на странице: { settings.NUM_POSTS }'
+        )
+        baseline = statistics.mean(sizes['PNG 960'])
+        for variant, values in sizes.items():
+            mean = statistics.mean(values)
+            self.stdout.write(
+                f'{ variant:>10}: { mean / 1024:8.1f} КБ на картинку, '
+                f'{ mean * settings.NUM_POSTS / 1024:9.1f} КБ на страницу '
+                f'({ mean / baseline:6.1%} от PNG)'
+            )
@@ -0,0 +1,113 @@
+import statistics
+import time
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.paginator import CursorPaginator, MergedCursorPaginator
+from posts.models import AuthorStats, Follow, Post, TimelineEntry, User
+
+PREFIX = 'bench-timeline'
+
+
+def measure(make_paginator, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        paginator = make_paginator()
+        page = paginator.get_page()
+        for _ in range(pages - 1):
+            page = paginator.get_page(after=page.next_cursor)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает ленту подписок с чтением через Follow '
+            'и с материализованной лентой')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument('--posts-per-author', type=int, default=2)
+        parser.add_argument('--celebrities', type=int, default=10)
+        parser.add_argument('--other-posts', type=int, default=10000)
+        parser.add_argument('--pages', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def seed(self, follows, posts_per_author, celebrities, other_posts):
+        User.objects.bulk_create(
+            User(username=f'{ PREFIX }-{ i }', password='!')
+            for i in range(follows + 2)
+        )
+        reader, outsider, *authors = User.objects.filter(
+            username__startswith=PREFIX
+        ).order_by('pk').values_list('pk', flat=True)
+        Follow.objects.bulk_create(
+            (Follow(user_id=reader, author_id=author) for author in authors)
+        )
+        Post.objects.bulk_create(
+            (Post(text=PREFIX, author_id=author)
+             for author in authors for _ in range(posts_per_author))
+        )
+        Post.objects.bulk_create(
+            (Post(text=PREFIX, author_id=outsider)
+             for _ in range(other_posts))
+        )
+        # Посты знаменитостей не раскладываются: лента читает их на лету.
+        AuthorStats.objects.bulk_create(
+            AuthorStats(
+                user_id=author, followers_count=settings.TIMELINE_FANOUT_LIMIT
+            )
+            for author in authors[:celebrities]
+        )
+        started = time.perf_counter()
+        TimelineEntry.objects.add_posts(
+            reader, Post.objects.filter(
+                author__following__user=reader
+            ).exclude(author__in=authors[:celebrities])
+        )
+        fan_out = (time.perf_counter() - started) * 1000
+        return User.objects.get(pk=reader), fan_out
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            reader, fan_out = self.seed(
+                options['follows'],
+                options['posts_per_author'],
+                options['celebrities'],
+                options['other_posts'],
+            )
+            paths = {
+                'fan-out-on-read': lambda: CursorPaginator(
+                    Post.objects.feed().filter(
+                        author__following__user=reader
+                    ),
+                    settings.NUM_POSTS,
+                ),
+                'timeline': lambda: MergedCursorPaginator(
+                    [
+                        (TimelineEntry.objects.feed(reader), 'post_id',
+                         attrgetter('post')),
+                        (TimelineEntry.objects.celebrity_posts(reader), 'pk',
+                         None),
+                    ],
+                    settings.NUM_POSTS,
+                ),
+            }
+            self.stdout.write(
+                f'Подписок: { options["follows"] }, '
+                f'из них знаменитостей: { options["celebrities"] }, '
+                f'заполнение ленты: { fan_out:.1f} мс'
+            )
+            for name, make_paginator in paths.items():
+                first = measure(make_paginator, 1, options['repeat'])
+                deep = measure(
+                    make_paginator, options['pages'], options['repeat']
+                )
+                self.stdout.write(
+                    f'{ name }: первая страница { first:.2f} мс, '
+                    f'{ options["pages"] } страниц { deep:.2f} мс'
+                )
+            transaction.set_rollback(True)
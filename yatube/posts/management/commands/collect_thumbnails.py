@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnail_gc
+
+
+class Command(BaseCommand):
+    help = 'Удаляет миниатюры удалённых и изменённых изображений постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать, ничего не удаляя',
+        )
+
+    def handle(self, *args, **options):
+        report = thumbnail_gc.collect(
+            options['batch_size'], options['dry_run']
+        )
+        self.stdout.write(
+            f'Изображений: { report.sources }, файлов: { report.files }, '
+            f'освобождено: { report.bytes / 1024:.1f} КБ'
+        )
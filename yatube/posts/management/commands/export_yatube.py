@@ -0,0 +1,24 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, группы, посты, комментарии и '
+            'подписки в NDJSON, по файлу на модель')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', nargs='?', default='data')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        os.makedirs(options['directory'], exist_ok=True)
+        for name, model, fields in transfer.MODELS:
+            path = transfer.path_for(options['directory'], name)
+            with open(path, 'w', encoding='utf-8') as file_:
+                count = transfer.export_model(
+                    model, fields, file_, options['chunk_size']
+                )
+            self.stdout.write(f'{ path }: { count }')
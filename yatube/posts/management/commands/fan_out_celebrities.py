@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = ('Бэкфилл: переносит в ленты подписчиков посты авторов, '
+            'у которых больше TIMELINE_FANOUT_LIMIT подписчиков')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=settings.TIMELINE_CELEBRITY_WINDOW,
+            help='За сколько последних секунд брать посты',
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(seconds=options['window'])
+        added = TimelineEntry.objects.fan_out_celebrities(since)
+        self.stdout.write(f'Добавлено записей в ленты: { added }')
@@ -0,0 +1,32 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные, выгруженные командой export_yatube'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', nargs='?', default='data')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--skip-derived',
+            action='store_true',
+            help='Не заполнять ленты, счётчики и поисковый индекс',
+        )
+
+    def handle(self, *args, **options):
+        for name, model, _ in transfer.MODELS:
+            path = transfer.path_for(options['directory'], name)
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as file_:
+                count = transfer.import_model(
+                    model, transfer.read_rows(file_), options['batch_size']
+                )
+            self.stdout.write(f'{ path }: { count }')
+        transfer.reset_sequences()
+        if not options['skip_derived']:
+            transfer.rebuild_derived()
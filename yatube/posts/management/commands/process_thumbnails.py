@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnail_gc, thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь задач на создание миниатюр'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь периодически',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument(
+            '--gc-interval',
+            type=float,
+            default=settings.THUMBNAIL_GC_INTERVAL,
+            help='Как часто удалять осиротевшие миниатюры, 0 — никогда',
+        )
+
+    def handle(self, *args, **options):
+        collected = time.monotonic()
+        while True:
+            done = thumbnails.run_pending(options['limit'])
+            if done:
+                self.stdout.write(f'Готово миниатюр: { done }')
+            if (options['gc_interval'] and time.monotonic() - collected
+                    >= options['gc_interval']):
+                report = thumbnail_gc.collect()
+                collected = time.monotonic()
+                if report.files:
+                    self.stdout.write(
+                        f'Удалено миниатюр: { report.files }, освобождено: '
+                        f'{ report.bytes / 1024:.1f} КБ'
+                    )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
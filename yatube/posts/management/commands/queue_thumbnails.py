@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = ('Ставит в очередь миниатюры для картинок, загруженных '
+            'до появления очереди')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queued = thumbnails.queue_existing(options['batch_size'])
+        self.stdout.write(
+            f'Поставлено задач: { queued }. Обработайте их командой '
+            f'process_thumbnails'
+        )
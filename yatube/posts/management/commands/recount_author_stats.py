@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats, Follow, Post, User
+
+FIELDS = ('posts_count', 'following_count', 'followers_count')
+
+
+def count_by(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(total=Count('pk')).order_by()
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и подписок авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не записывая',
+        )
+
+    def handle(self, *args, **options):
+        actual = {
+            'posts_count': count_by(Post.objects, 'author'),
+            'following_count': count_by(Follow.objects, 'user'),
+            'followers_count': count_by(Follow.objects, 'author'),
+        }
+        stored = AuthorStats.objects.in_bulk()
+        missing, drifted = [], []
+        for user_id in User.objects.values_list('pk', flat=True).iterator():
+            values = {
+                field: actual[field].get(user_id, 0) for field in FIELDS
+            }
+            stats = stored.get(user_id)
+            if stats is None:
+                missing.append(AuthorStats(user_id=user_id, **values))
+                continue
+            if any(getattr(stats, field) != values[field]
+                   for field in FIELDS):
+                for field in FIELDS:
+                    setattr(stats, field, values[field])
+                drifted.append(stats)
+        if not options['dry_run']:
+            with transaction.atomic():
+                AuthorStats.objects.bulk_create(missing)
+                AuthorStats.objects.bulk_update(drifted, FIELDS)
+        self.stdout.write(
+            f'Создано: { len(missing) }, исправлено: { len(drifted) }'
+        )
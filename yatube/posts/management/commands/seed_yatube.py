@@ -0,0 +1,58 @@
+from django.contrib.auth.hashers import (UNUSABLE_PASSWORD_PREFIX,
+                                         make_password)
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import seed, transfer
+
+
+class Command(BaseCommand):
+    help = ('Генерирует пользователей, группы, подписки, посты и '
+            'комментарии для нагрузочных тестов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', choices=seed.PROFILES, default='small',
+            help='Набор объёмов по умолчанию',
+        )
+        for name in ('users', 'groups', 'posts', 'comments'):
+            parser.add_argument(f'--{ name }', type=int)
+        parser.add_argument(
+            '--follows', type=int,
+            help='Среднее число подписок на пользователя',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного закона популярности авторов',
+        )
+        parser.add_argument(
+            '--images', type=float, default=0,
+            help='Доля постов с картинкой, от 0 до 1',
+        )
+        parser.add_argument('--image-pool', type=int, default=10)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--password',
+            help='Пароль для всех пользователей; без него вход невозможен',
+        )
+        parser.add_argument(
+            '--skip-derived',
+            action='store_true',
+            help='Не заполнять ленты, счётчики и поисковый индекс',
+        )
+
+    def handle(self, *args, **options):
+        for name, value in seed.PROFILES[options['profile']].items():
+            if options[name] is None:
+                options[name] = value
+        if not options['users'] and (options['posts'] or options['comments']):
+            raise CommandError('Для постов и комментариев нужны пользователи')
+        options['password'] = (
+            make_password(options['password']) if options['password']
+            else UNUSABLE_PASSWORD_PREFIX
+        )
+        for name, count in seed.Seeder(options).run():
+            self.stdout.write(f'{ name }: { count }')
+        if not options['skip_derived']:
+            transfer.rebuild_derived()
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from posts import search
+
+
+def create_search_index(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    search.create_index(schema_editor)
+    search.index_posts(
+        Post.objects.using(schema_editor.connection.alias).values_list(
+            'pk', 'text'
+        ).iterator(),
+        schema_editor.connection,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0027_thumbnailjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models
+from django.db.models import F, Window
+from django.db.models.functions import Greatest, RowNumber
 
 from core.models import CreatedModel
 
@@ -31,6 +33,27 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'text',
+        'pub_date',
+        'updated',
+        'image',
+        'thumbnail_pending',
+        'author__username',
+        'group__slug',
+        'group__title',
+    )
+
+    def feed(self, **annotations):
+        queryset = self.select_related('author', 'group').only(
+            *self.FEED_FIELDS
+        )
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+
 class Post(CreatedModel):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -56,15 +79,46 @@ class Post(CreatedModel):
         upload_to=settings.UPLOAD_TO,
         blank=True
     )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
+    thumbnail_pending = models.BooleanField(
+        verbose_name='Миниатюра в обработке',
+        default=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(CreatedModel.Meta):
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                name='post_pub_date_idx',
+                fields=['-pub_date', '-id'],
+            ),
+            models.Index(
+                name='post_author_pub_date_idx',
+                fields=['author', '-pub_date', '-id'],
+            ),
+            models.Index(
+                name='post_group_pub_date_idx',
+                fields=['group', '-pub_date', '-id'],
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
 
+class CommentQuerySet(models.QuerySet):
+    THREAD_FIELDS = ('text', 'pub_date', 'post_id', 'author__username')
+
+    def thread(self):
+        return self.select_related('author').only(*self.THREAD_FIELDS)
+
+
 class Comment(CreatedModel):
     text = models.TextField(
         verbose_name='Текст комментария',
@@ -83,9 +137,17 @@ class Comment(CreatedModel):
         verbose_name='Автор',
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta(CreatedModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                name='comment_post_pub_date_idx',
+                fields=['post', '-pub_date', '-id'],
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -114,7 +176,287 @@ class Follow(models.Model):
                 fields=['user', 'author'],
             )
         ]
+        indexes = [
+            models.Index(
+                name='follow_author_user_idx',
+                fields=['author', 'user'],
+            ),
+        ]
 
     def __str__(self):
         return (f'Подписчик: { self.user }\n'
                 f'Автор: { self.author }')
+
+
+class AuthorStatsQuerySet(models.QuerySet):
+    def for_user(self, user):
+        try:
+            return self.get(user=user)
+        except self.model.DoesNotExist:
+            stats, _ = self.get_or_create(
+                user=user, defaults=self.model.count_for(user)
+            )
+            return stats
+
+    def change(self, user, **deltas):
+        updated = self.filter(user=user).update(**{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        })
+        if not updated:
+            self.for_user(user)
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Постов',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписок',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписчиков',
+    )
+
+    objects = AuthorStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'Статистика: { self.user }'
+
+    @staticmethod
+    def count_for(user):
+        return {
+            'posts_count': Post.objects.filter(author=user).count(),
+            'following_count': Follow.objects.filter(user=user).count(),
+            'followers_count': Follow.objects.filter(author=user).count(),
+        }
+
+
+class TimelineQuerySet(models.QuerySet):
+    def is_celebrity(self, author):
+        return AuthorStats.objects.filter(
+            user=author,
+            followers_count__gte=settings.TIMELINE_FANOUT_LIMIT,
+        ).exists()
+
+    def add_posts(self, user_id, posts):
+        self.bulk_create(
+            (self.model(user_id=user_id, post_id=pk, pub_date=pub_date)
+             for pk, pub_date in posts.values_list('pk', 'pub_date')),
+            ignore_conflicts=True,
+        )
+
+    def fan_out(self, post):
+        self.fan_out_posts(post.author, [post])
+
+    def fan_out_posts(self, author, posts):
+        if self.is_celebrity(author):
+            return
+        followers = Follow.objects.filter(
+            author=author
+        ).values_list('user', flat=True)
+        self.bulk_create(
+            (self.model(user_id=user_id, post=post, pub_date=post.pub_date)
+             for user_id in followers.iterator() for post in posts),
+            ignore_conflicts=True,
+        )
+
+    def backfill(self, user_id, author_id):
+        self.add_posts(
+            user_id,
+            Post.objects.filter(author=author_id).order_by('-pub_date')[
+                :settings.TIMELINE_BACKFILL
+            ],
+        )
+
+    def trim(self, user_id, author_id):
+        self.filter(user=user_id, post__author=author_id).delete()
+
+    def insert_select(self, sql, params):
+        # sql — выборка (читатель, пост, дата поста); переносим её в ленты
+        # одним INSERT ... SELECT, не поднимая строки в Python.
+        connection = connections[self.db]
+        columns = ', '.join(
+            connection.ops.quote_name(self.model._meta.get_field(name).column)
+            for name in ('user', 'post', 'pub_date')
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{ connection.ops.insert_statement(ignore_conflicts=True) } '
+                f'{ connection.ops.quote_name(self.model._meta.db_table) } '
+                f'({ columns }) { sql } '
+                f'{ connection.ops.ignore_conflicts_suffix_sql(True) }',
+                params,
+            )
+            return cursor.rowcount
+
+    def insert_from(self, rows):
+        return self.insert_select(
+            *rows.query.get_compiler(self.db).as_sql()
+        )
+
+    def backfill_all(self):
+        # Как backfill по каждой подписке, но одним запросом: последние
+        # TIMELINE_BACKFILL постов каждого автора для каждого подписчика.
+        connection = connections[self.db]
+        if not connection.features.supports_over_clause:
+            for user_id, author_id in Follow.objects.values_list(
+                'user', 'author'
+            ).iterator():
+                self.backfill(user_id, author_id)
+            return
+        ranked = Follow.objects.filter(author__posts__isnull=False).annotate(
+            reader=F('user'),
+            entry_post=F('author__posts'),
+            entry_pub_date=F('author__posts__pub_date'),
+            position=Window(
+                RowNumber(),
+                partition_by=[F('user'), F('author')],
+                order_by=F('author__posts__pub_date').desc(),
+            ),
+        ).values_list('reader', 'entry_post', 'entry_pub_date', 'position')
+        sql, params = ranked.query.get_compiler(self.db).as_sql()
+        qn = connection.ops.quote_name
+        self.insert_select(
+            f'SELECT { qn("reader") }, { qn("entry_post") }, '
+            f'{ qn("entry_pub_date") } FROM ({ sql }) ranked '
+            f'WHERE { qn("position") } <= %s',
+            (*params, settings.TIMELINE_BACKFILL),
+        )
+
+    def celebrity_posts(self, user):
+        # Посты авторов с большим числом подписчиков не раскладываются при
+        # публикации: лента подписок читает их на лету. Уже разложенные
+        # (бэкфилл при подписке, fan_out_celebrities) отдаёт сама лента.
+        return Post.objects.feed().filter(
+            author__following__user=user,
+            author__stats__followers_count__gte=(
+                settings.TIMELINE_FANOUT_LIMIT
+            ),
+        ).exclude(timeline_entries__user=user)
+
+    def fan_out_celebrities(self, since):
+        # Бэкфилл: переносит свежие посты знаменитостей в ленты, чтобы
+        # чтение на лету обходило меньше строк.
+        return self.insert_from(Follow.objects.filter(
+            author__stats__followers_count__gte=(
+                settings.TIMELINE_FANOUT_LIMIT
+            ),
+            author__posts__pub_date__gte=since,
+        ).values_list('user', 'author__posts', 'author__posts__pub_date'))
+
+    def feed(self, user):
+        return self.filter(user=user).select_related(
+            'post__author', 'post__group'
+        ).only('pub_date', 'post', *(
+            f'post__{ field }' for field in PostQuerySet.FEED_FIELDS
+        ))
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата создания поста',
+    )
+
+    objects = TimelineQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_timeline_entry',
+                fields=['user', 'post'],
+            )
+        ]
+        indexes = [
+            models.Index(
+                name='timeline_user_pub_date_idx',
+                fields=['user', '-pub_date', '-post'],
+            )
+        ]
+
+    def __str__(self):
+        return f'{ self.user }: { self.post }'
+
+
+class ThumbnailJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='thumbnail_jobs',
+        verbose_name='Пост',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Задача миниатюры'
+        verbose_name_plural = 'Задачи миниатюр'
+        ordering = ('created',)
+        indexes = [
+            models.Index(
+                name='thumbnail_job_status_idx',
+                fields=['status', 'created'],
+            )
+        ]
+
+    def __str__(self):
+        return f'{ self.post_id }: { self.status }'
@@ -0,0 +1,36 @@
+from django.db import connection, transaction
+
+from core.cache import bump_generation
+
+from . import search, thumbnails
+from .models import AuthorStats, Post, TimelineEntry
+
+
+def assign_ids(author, posts):
+    # SQLite не возвращает ключи из bulk_create. Внутри транзакции
+    # последние посты автора и есть только что вставленные.
+    ids = Post.objects.filter(author=author).order_by(
+        '-pk'
+    ).values_list('pk', flat=True)[:len(posts)]
+    for post, pk in zip(posts, reversed(list(ids))):
+        post.pk = pk
+
+
+def publish(author, posts):
+    # Сигналы при bulk_create не срабатывают, поэтому счётчики, ленты
+    # подписчиков, поисковый индекс и миниатюры обновляем здесь.
+    for post in posts:
+        post.author = author
+    with transaction.atomic():
+        Post.objects.bulk_create(posts)
+        if not connection.features.can_return_ids_from_bulk_insert:
+            assign_ids(author, posts)
+        AuthorStats.objects.change(author, posts_count=len(posts))
+        TimelineEntry.objects.fan_out_posts(author, posts)
+        search.index_posts((post.pk, post.text) for post in posts)
+        for post in posts:
+            if post.image:
+                thumbnails.enqueue(post)
+        bump_generation()
+        transaction.on_commit(bump_generation)
+    return posts
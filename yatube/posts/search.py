@@ -0,0 +1,248 @@
+import re
+from itertools import islice
+
+import snowballstemmer
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from core.paginator import CursorPage, decode_token, encode_token
+
+from .models import Post
+
+SEARCH_TABLE = 'posts_search_index'
+SEARCH_LANGUAGE = 'russian'
+SNIPPET_WORDS = 40
+INDEX_BATCH_SIZE = 500
+WORD = re.compile(r'\w+')
+
+stemmer = snowballstemmer.stemmer(SEARCH_LANGUAGE)
+
+
+def stems(text):
+    return [
+        stemmer.stemWord(word.lower().replace('ё', 'е'))
+        for word in WORD.findall(text)
+    ]
+
+
+class PostgresBackend:
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE { SEARCH_TABLE } ('
+            'post_id integer PRIMARY KEY '
+            'REFERENCES posts_post (id) ON DELETE CASCADE '
+            'DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX { SEARCH_TABLE }_document_idx '
+            f'ON { SEARCH_TABLE } USING GIN (document)'
+        )
+
+    def index(self, cursor, posts):
+        cursor.executemany(
+            f'INSERT INTO { SEARCH_TABLE } (post_id, document) '
+            f"VALUES (%s, to_tsvector('{ SEARCH_LANGUAGE }', %s)) "
+            'ON CONFLICT (post_id) '
+            'DO UPDATE SET document = EXCLUDED.document',
+            posts,
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(
+            f'DELETE FROM { SEARCH_TABLE } WHERE post_id = %s', [post_id]
+        )
+
+    def matches(self, query):
+        return (
+            f'SELECT post_id, ts_rank(document, query) AS rank '
+            f'FROM { SEARCH_TABLE }, '
+            f"plainto_tsquery('{ SEARCH_LANGUAGE }', %s) AS query "
+            'WHERE document @@ query',
+            [query],
+        )
+
+
+class SqliteBackend:
+    # В FTS5 нет русского стеммера, поэтому в индекс кладём уже
+    # выделенные основы слов.
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE { SEARCH_TABLE } '
+            'USING fts5(document, tokenize=unicode61)'
+        )
+
+    def index(self, cursor, posts):
+        placeholders = ', '.join(['%s'] * len(posts))
+        cursor.execute(
+            f'DELETE FROM { SEARCH_TABLE } '
+            f'WHERE rowid IN ({ placeholders })',
+            [post_id for post_id, _ in posts],
+        )
+        cursor.executemany(
+            f'INSERT INTO { SEARCH_TABLE } (rowid, document) '
+            'VALUES (%s, %s)',
+            [[post_id, ' '.join(stems(text))] for post_id, text in posts],
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(
+            f'DELETE FROM { SEARCH_TABLE } WHERE rowid = %s', [post_id]
+        )
+
+    def matches(self, query):
+        terms = ' '.join(f'"{ stem }"' for stem in stems(query))
+        return (
+            f'SELECT rowid AS post_id, -bm25({ SEARCH_TABLE }) AS rank '
+            f'FROM { SEARCH_TABLE } WHERE { SEARCH_TABLE } MATCH %s',
+            [terms],
+        )
+
+
+BACKENDS = {
+    'postgresql': PostgresBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+def get_backend(using=None):
+    backend = BACKENDS.get((using or connection).vendor)
+    return backend() if backend else None
+
+
+def create_index(schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.create(cursor)
+
+
+def drop_index(schema_editor):
+    if get_backend(schema_editor.connection) is None:
+        return
+    schema_editor.execute(f'DROP TABLE { SEARCH_TABLE }')
+
+
+def index_posts(posts, using=None):
+    using = using or connection
+    backend = get_backend(using)
+    if backend is None:
+        return
+    posts = iter(posts)
+    with using.cursor() as cursor:
+        while True:
+            batch = list(islice(posts, INDEX_BATCH_SIZE))
+            if not batch:
+                break
+            backend.index(cursor, batch)
+
+
+def remove_post(post_id):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, post_id)
+
+
+def rebuild():
+    if get_backend() is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM { SEARCH_TABLE }')
+    index_posts(Post.objects.values_list('pk', 'text').iterator())
+
+
+def highlight(text, query):
+    terms = set(stems(query))
+    words = list(WORD.finditer(text))
+    marked = [
+        index for index, word in enumerate(words)
+        if stems(word.group())[0] in terms
+    ]
+    first = max(marked[0] - SNIPPET_WORDS // 4, 0) if marked else 0
+    words = words[first:first + SNIPPET_WORDS]
+    if not words:
+        return escape(text)
+    parts = ['…'] if first else []
+    position = words[0].start()
+    for word in words:
+        parts.append(escape(text[position:word.start()]))
+        if stems(word.group())[0] in terms:
+            parts.append(f'<mark>{ escape(word.group()) }</mark>')
+        else:
+            parts.append(escape(word.group()))
+        position = word.end()
+    if words[-1].end() < len(text.rstrip()):
+        parts.append('…')
+    return mark_safe(''.join(parts))
+
+
+class SearchPage(CursorPage):
+    @staticmethod
+    def cursor(obj):
+        return encode_token(repr(obj.rank), obj.pk)
+
+
+class SearchPaginator:
+    def __init__(self, query, per_page):
+        self.query = query
+        self.per_page = per_page
+        self.backend = get_backend()
+        if self.backend is None:
+            raise ImproperlyConfigured(
+                f'Поиск не поддерживает СУБД { connection.vendor }'
+            )
+
+    def get_page(self, after=None, before=None):
+        after = decode_token(after, float)
+        if after is not None:
+            return self._page(after, reverse=False)
+        before = decode_token(before, float)
+        if before is not None:
+            return self._page(before, reverse=True)
+        return self._page(None, reverse=False)
+
+    def _ranked(self, key, reverse):
+        if not stems(self.query):
+            return []
+        sql, params = self.backend.matches(self.query)
+        operator, order = ('>', 'ASC') if reverse else ('<', 'DESC')
+        where = ''
+        if key is not None:
+            where = (
+                f'WHERE rank { operator } %s '
+                f'OR (rank = %s AND post_id { operator } %s)'
+            )
+            params += [key[0], key[0], key[1]]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id, rank FROM ({ sql }) AS matches { where } '
+                f'ORDER BY rank { order }, post_id { order } LIMIT %s',
+                params + [self.per_page + 1],
+            )
+            return cursor.fetchall()
+
+    def _page(self, key, reverse):
+        rows = self._ranked(key, reverse)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            if not has_more:
+                return self._page(None, reverse=False)
+            rows.reverse()
+        posts = Post.objects.feed().in_bulk([post_id for post_id, _ in rows])
+        objects = []
+        for post_id, rank in rows:
+            post = posts.get(post_id)
+            if post is None:
+                continue
+            post.rank = rank
+            post.snippet = highlight(post.text, self.query)
+            objects.append(post)
+        if reverse:
+            return SearchPage(objects, True, True)
+        return SearchPage(objects, has_more, key is not None)
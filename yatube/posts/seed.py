@@ -0,0 +1,192 @@
+import bisect
+import datetime
+import itertools
+import random
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from PIL import Image
+
+from . import transfer
+from .models import Comment, Follow, Group, Post, User
+
+PROFILES = {
+    'small': {
+        'users': 100, 'groups': 5, 'posts': 1000, 'comments': 2000,
+        'follows': 10,
+    },
+    'medium': {
+        'users': 10000, 'groups': 50, 'posts': 100000, 'comments': 300000,
+        'follows': 30,
+    },
+    'large': {
+        'users': 100000, 'groups': 200, 'posts': 1000000,
+        'comments': 3000000, 'follows': 50,
+    },
+}
+START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+WORDS = (
+    'дневник утро день вечер дорога письмо книга музыка сад дом война мир '
+    'кот собака море лес поле город деревня работа отдых друг семья'
+).split()
+GROUP_SHARE = 0.7
+IMAGE_SIZE = (960, 540)
+
+
+class PowerLaw:
+    def __init__(self, values, alpha, rng):
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(
+            1 / (rank + 1) ** alpha for rank in range(len(values))
+        ))
+        # Перемешиваем, чтобы популярность не совпадала с порядком id.
+        self.values = list(values)
+        rng.shuffle(self.values)
+
+    def __call__(self):
+        point = self.rng.random() * self.cum_weights[-1]
+        index = bisect.bisect(self.cum_weights, point)
+        return self.values[min(index, len(self.values) - 1)]
+
+
+class Seeder:
+    def __init__(self, options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+
+    def ids(self, model, count):
+        first = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        return range(first, first + count)
+
+    def sentence(self, low, high):
+        return ' '.join(
+            self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high))
+        ).capitalize()
+
+    def moment(self):
+        return START + datetime.timedelta(
+            seconds=self.rng.randrange(self.options['days'] * 24 * 60 * 60)
+        )
+
+    def users(self, user_ids, password):
+        for user_id in user_ids:
+            yield {
+                'id': user_id,
+                'username': f'seed{ user_id }',
+                'password': password,
+                'date_joined': START,
+            }
+
+    def groups(self, group_ids):
+        for group_id in group_ids:
+            yield {
+                'id': group_id,
+                'title': f'Группа { group_id }',
+                'slug': f'seed-{ group_id }',
+                'description': f'Сгенерированная группа { group_id }',
+            }
+
+    def images(self):
+        names = []
+        for index in range(self.options['image_pool']):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            name = (
+                f'{ settings.UPLOAD_TO }seed-{ self.options["seed"] }-'
+                f'{ index }.jpg'
+            )
+            if not default_storage.exists(name):
+                content = BytesIO()
+                Image.new('RGB', IMAGE_SIZE, color).save(
+                    content, 'JPEG', quality=80
+                )
+                default_storage.save(name, ContentFile(content.getvalue()))
+            names.append(name)
+        return names
+
+    def posts(self, post_ids, authors, group_ids, image_names):
+        for post_id in post_ids:
+            with_group = group_ids and self.rng.random() < GROUP_SHARE
+            with_image = (
+                image_names and self.rng.random() < self.options['images']
+            )
+            yield {
+                'id': post_id,
+                'text': self.sentence(5, 60),
+                'pub_date': self.moment(),
+                'author_id': authors(),
+                'group_id': self.rng.choice(group_ids) if with_group else None,
+                'image': self.rng.choice(image_names) if with_image else '',
+            }
+
+    def follows(self, first_id, user_ids, authors):
+        follow_id = first_id
+        for user_id in user_ids:
+            wanted = min(
+                self.rng.randint(0, 2 * self.options['follows']),
+                len(user_ids) - 1,
+            )
+            following = set()
+            for _ in range(wanted * 4):
+                if len(following) == wanted:
+                    break
+                author_id = authors()
+                if author_id != user_id:
+                    following.add(author_id)
+            for author_id in sorted(following):
+                yield {
+                    'id': follow_id, 'user_id': user_id,
+                    'author_id': author_id,
+                }
+                follow_id += 1
+
+    def comments(self, comment_ids, threads, user_ids):
+        for comment_id in comment_ids:
+            yield {
+                'id': comment_id,
+                'text': self.sentence(3, 30),
+                'pub_date': self.moment(),
+                'post_id': threads(),
+                'author_id': self.rng.choice(user_ids),
+            }
+
+    def run(self):
+        options = self.options
+        batch_size = options['batch_size']
+        user_ids = self.ids(User, options['users'])
+        group_ids = self.ids(Group, options['groups'])
+        post_ids = self.ids(Post, options['posts'])
+        comment_ids = self.ids(Comment, options['comments'])
+        # Авторы популярны по степенному закону: немногие пишут и
+        # собирают подписчиков больше всех остальных.
+        authors = PowerLaw(user_ids, options['alpha'], self.rng)
+        image_names = self.images() if options['images'] else []
+        yield 'users', transfer.import_model(
+            User, self.users(user_ids, options['password']), batch_size
+        )
+        yield 'groups', transfer.import_model(
+            Group, self.groups(group_ids), batch_size
+        )
+        yield 'posts', transfer.import_model(
+            Post,
+            self.posts(post_ids, authors, group_ids, image_names),
+            batch_size,
+        )
+        yield 'follows', transfer.import_model(
+            Follow,
+            self.follows(self.ids(Follow, 1)[0], user_ids, authors),
+            batch_size,
+        )
+        if post_ids:
+            yield 'comments', transfer.import_model(
+                Comment,
+                self.comments(
+                    comment_ids,
+                    PowerLaw(post_ids, options['alpha'], self.rng),
+                    user_ids,
+                ),
+                batch_size,
+            )
+        transfer.reset_sequences()
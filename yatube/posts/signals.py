@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import PAGES_GENERATION, bump_generation
+
+from . import search
+from .models import AuthorStats, Follow, Group, Post, TimelineEntry, User
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_fragments(sender, **kwargs):
+    # Повторный сброс после коммита отбрасывает фрагменты, которые
+    # параллельные запросы успели собрать из ещё не закоммиченных данных.
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_pages(sender, **kwargs):
+    # Подписки меняют только счётчики в профилях, фрагменты с постами
+    # сбрасывать незачем.
+    bump_generation(PAGES_GENERATION)
+    transaction.on_commit(lambda: bump_generation(PAGES_GENERATION))
+
+
+@receiver(post_save, sender=Group)
+def touch_group_posts(sender, instance, created, **kwargs):
+    if not created:
+        instance.posts.update(updated=timezone.now())
+
+
+@receiver(pre_delete, sender=Group)
+def touch_orphaned_posts(sender, instance, **kwargs):
+    instance.posts.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        TimelineEntry.objects.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'text' not in update_fields:
+        return
+    search.index_posts([(instance.pk, instance.text)])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        TimelineEntry.objects.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    TimelineEntry.objects.trim(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, using, raw=False,
+                        **kwargs):
+    # Заводим счётчики сразу, чтобы страницы не пересчитывали их
+    # COUNT-запросами при первом показе автора.
+    if created and not raw:
+        AuthorStats.objects.using(using).create(user=instance)
@@ -0,0 +1,32 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+def post_card_key(post, hide_group):
+    return (f'post_card:{ post.pk }:{ post.updated.timestamp() }:'
+            f'{ int(bool(hide_group)) }')
+
+
+@register.simple_tag
+def post_card(post, hide_group=False):
+    key = post_card_key(post, hide_group)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(
+            'posts/includes/post.html',
+            {'post': post, 'hide_group': hide_group},
+        )
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(post):
+    return thumbnails.picture(post)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..models import Comment, Follow, Group, Post, User
+
+SLUG = 'test-slug'
+USERNAME = 'NoName'
+USERNAME_2 = 'NoName2'
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME_2])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тест текст', author=cls.user2, group=cls.group
+        )
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.post.pk]
+        )
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNotModified(self, client, address, response):
+        repeated = client.get(
+            address,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(repeated.status_code, 304)
+        self.assertEqual(repeated.content, b'')
+        self.assertTemplateNotUsed(repeated, 'base.html')
+        self.assertEqual(repeated['ETag'], response['ETag'])
+
+    def test_unchanged_pages_are_not_rendered_again(self):
+        for address in (
+            INDEX_URL, GROUP_LIST_URL, PROFILE_URL, self.POST_DETAIL_URL
+        ):
+            for client in (self.guest_client, self.authorized_client):
+                with self.subTest(address=address, client=client):
+                    response = client.get(address)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotModified(client, address, response)
+
+    def test_deleting_newest_post_is_not_modified(self):
+        for address in (INDEX_URL, PROFILE_URL):
+            with self.subTest(address=address):
+                newest = Post.objects.create(
+                    text='Новый пост', author=self.user2
+                )
+                response = self.guest_client.get(address)
+                self.assertNotIn('Last-Modified', response)
+                newest.delete()
+                repeated = self.guest_client.get(
+                    address,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                    HTTP_IF_MODIFIED_SINCE=http_date(),
+                )
+                self.assertEqual(repeated.status_code, 200)
+                self.assertNotContains(repeated, 'Новый пост')
+
+    def test_etag_changes_with_content(self):
+        cases = [
+            [INDEX_URL, lambda: Post.objects.create(
+                text='Новый пост', author=self.user2
+            )],
+            [GROUP_LIST_URL, lambda: Group.objects.get(
+                pk=self.group.pk
+            ).save()],
+            [PROFILE_URL, lambda: Follow.objects.create(
+                user=self.user, author=self.user2
+            )],
+            [self.POST_DETAIL_URL, lambda: Comment.objects.create(
+                text='Тест коммент', post=self.post, author=self.user
+            )],
+        ]
+        for address, change in cases:
+            with self.subTest(address=address):
+                etag = self.authorized_client.get(address)['ETag']
+                change()
+                response = self.authorized_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_user(self):
+        self.assertNotEqual(
+            self.guest_client.get(INDEX_URL)['ETag'],
+            self.authorized_client.get(INDEX_URL)['ETag'],
+        )
+
+    def test_cache_control(self):
+        cases = [
+            [self.guest_client,
+             f'max-age={ settings.ANONYMOUS_CACHE_SECONDS }', 'public'],
+            [self.authorized_client, 'no-cache', 'private'],
+        ]
+        for client, *directives in cases:
+            with self.subTest(directives=directives):
+                header = client.get(INDEX_URL)['Cache-Control']
+                for directive in directives:
+                    self.assertIn(directive, header)
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+SLUG = 'test-slug'
+USERNAME = 'NoName'
+USERNAME_2 = 'NoName2'
+INDEX_URL = reverse('posts:index')
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME_2])
+POST_CREATE_URL = reverse('posts:post_create')
+SORT_MARKERS = {'sqlite': 'TEMP B-TREE', 'postgresql': 'Sort'}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # На маленьких тестовых таблицах планировщик выбрал бы
+            # последовательное чтение, даже если индекс подходит.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN { sql }')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN { sql }')
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+class IndexUsageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тест текст', author=cls.user2, group=cls.group
+        )
+        Comment.objects.create(
+            text='Тест коммент', post=cls.post, author=cls.user
+        )
+        Follow.objects.create(user=cls.user, author=cls.user2)
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.post.pk]
+        )
+        cls.guest_client = Client()
+        cls.follower_client = Client()
+        cls.follower_client.force_login(cls.user)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.user2)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertUsesIndex(self, queries, marker, index):
+        statements = [
+            query['sql'] for query in queries
+            if marker in query['sql'] and query['sql'].startswith('SELECT')
+            and 'COUNT(' not in query['sql']
+        ]
+        self.assertTrue(statements, f'Нет запроса с { marker }')
+        for sql in statements:
+            plan = explain(sql)
+            self.assertIn(index, plan, sql)
+            self.assertNotIn(SORT_MARKERS[connection.vendor], plan, sql)
+
+    def test_view_queries_use_composite_indexes(self):
+        cases = [
+            # SQLite дописывает rowid в любой индекс, и ему хватает
+            # одиночного индекса по pub_date; Postgres берёт составной.
+            [self.guest_client.get, INDEX_URL, {},
+             'FROM "posts_post" INNER JOIN', 'post_pub_date'],
+            [self.follower_client.get, FOLLOW_INDEX_URL, {},
+             '"posts_timelineentry"."user_id" =',
+             'timeline_user_pub_date_idx'],
+            [self.guest_client.get, PROFILE_URL, {},
+             '"posts_post"."author_id" =', 'post_author_pub_date_idx'],
+            [self.guest_client.get, GROUP_LIST_URL, {},
+             '"posts_post"."group_id" =', 'post_group_pub_date_idx'],
+            [self.guest_client.get, self.POST_DETAIL_URL, {},
+             '"posts_comment"."post_id" =', 'comment_post_pub_date_idx'],
+            [self.author_client.post, POST_CREATE_URL, {'text': 'Новый'},
+             '"posts_follow"."author_id" =', 'follow_author_user_idx'],
+        ]
+        for request, address, data, marker, index in cases:
+            with self.subTest(address=address, index=index):
+                with CaptureQueriesContext(connection) as queries:
+                    request(address, data)
+                self.assertUsesIndex(queries.captured_queries, marker, index)
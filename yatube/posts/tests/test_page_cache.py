@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Post, User
+
+USERNAME = 'Reader'
+USERNAME_2 = 'Writer'
+INDEX_URL = reverse('posts:index')
+PROFILE_URL = reverse('posts:profile', args=[USERNAME_2])
+FOLLOW_URL = reverse('posts:profile_follow', args=[USERNAME_2])
+PAGE_TEMPLATES = ('base.html', 'includes/header.html', 'posts/profile.html')
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст { index }', author=cls.user2)
+            for index in range(settings.NUM_POSTS + 1)
+        )
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertServedFromCache(self, response):
+        self.assertEqual(response.status_code, 200)
+        for template in PAGE_TEMPLATES:
+            self.assertTemplateNotUsed(response, template)
+
+    def test_anonymous_page_is_served_from_cache(self):
+        first = self.guest_client.get(PROFILE_URL)
+        self.assertTemplateUsed(first, 'posts/profile.html')
+        second = self.guest_client.get(PROFILE_URL)
+        self.assertServedFromCache(second)
+        self.assertEqual(first.content, second.content)
+        self.assertNotContains(second, 'Подписаться')
+        self.assertNotContains(second, USERNAME)
+
+    def test_holes_are_filled_for_authorized_user(self):
+        self.guest_client.get(PROFILE_URL)
+        response = self.authorized_client.get(PROFILE_URL)
+        self.assertServedFromCache(response)
+        self.assertTemplateUsed(response, 'includes/auth_links.html')
+        self.assertTemplateUsed(response, 'posts/includes/follow_button.html')
+        self.assertContains(response, 'Пользователь:')
+        self.assertContains(response, USERNAME)
+        self.assertContains(response, FOLLOW_URL)
+        self.assertNotContains(self.guest_client.get(PROFILE_URL), USERNAME)
+
+    def test_authorized_render_does_not_leak_into_cache(self):
+        self.authorized_client.get(INDEX_URL)
+        response = self.guest_client.get(INDEX_URL)
+        self.assertServedFromCache(response)
+        self.assertNotContains(response, USERNAME)
+        self.assertNotContains(response, 'Избранные авторы')
+
+    def test_follow_invalidates_profile(self):
+        self.authorized_client.get(PROFILE_URL)
+        self.authorized_client.get(FOLLOW_URL)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.user2).exists()
+        )
+        response = self.authorized_client.get(PROFILE_URL)
+        self.assertContains(response, 'Подписчики: 1')
+        self.assertContains(response, 'Отписаться')
+
+    def test_pages_are_keyed_by_query_string(self):
+        self.guest_client.get(INDEX_URL)
+        response = self.guest_client.get(INDEX_URL, {'page': 2})
+        self.assertTemplateUsed(response, 'posts/index.html')
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_new_post_invalidates_index(self):
+        self.guest_client.get(INDEX_URL)
+        Post.objects.create(text='Новый пост', author=self.user)
+        self.assertContains(self.guest_client.get(INDEX_URL), 'Новый пост')
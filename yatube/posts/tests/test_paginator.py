@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import (CursorPage, decode_cursor, encode_cursor,
+                            estimated_count)
+
+from ..models import Group, Post, User
+
+USERNAME = 'NoName'
+SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+POSTS_COUNT = settings.NUM_POSTS * 2 + 3
+PAGES_COUNT = 3
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст { i }', author=cls.user, group=cls.group)
+            for i in range(POSTS_COUNT)
+        )
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def walk_forward(self):
+        pages = []
+        response = self.guest_client.get(INDEX_URL)
+        pages.append(response.context['page_obj'])
+        while pages[-1].has_next():
+            response = self.guest_client.get(
+                INDEX_URL, {'after': pages[-1].next_cursor}
+            )
+            pages.append(response.context['page_obj'])
+        return pages
+
+    def test_cursor_pages_cover_all_posts_in_order(self):
+        posts = [post for page in self.walk_forward() for post in page]
+        self.assertEqual(
+            [post.pk for post in posts],
+            list(Post.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True))
+        )
+
+    def test_before_cursor_returns_previous_page(self):
+        pages = self.walk_forward()
+        response = self.guest_client.get(
+            INDEX_URL, {'before': pages[-1].previous_cursor}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(pages[-2])
+        )
+
+    def test_legacy_page_number_still_works(self):
+        response = self.guest_client.get(INDEX_URL, {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(
+            list(page_obj), list(self.walk_forward()[1])
+        )
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.guest_client.get(INDEX_URL, {'after': '%%%'})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_pages_do_not_count_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(INDEX_URL, {'page': 3})
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('COUNT(', query['sql'].upper())
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(post.pub_date, post.pk)),
+            (post.pub_date, post.pk)
+        )
+
+    def test_page_range_is_elided(self):
+        cases = [
+            [1, 50, [1, 2, 3, None, 50]],
+            [4, 50, [1, 2, 3, 4, 5, 6, None, 50]],
+            [10, 50, [1, None, 8, 9, 10, 11, 12, None, 50]],
+            [49, 50, [1, None, 47, 48, 49, 50]],
+            [2, 3, [1, 2, 3]],
+        ]
+        for number, num_pages, page_range in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                page = CursorPage([], True, True, number, num_pages, 2)
+                self.assertEqual(page.page_range, page_range)
+
+    def test_numbered_page_shows_window(self):
+        response = self.guest_client.get(INDEX_URL, {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.num_pages, PAGES_COUNT)
+        self.assertEqual(page_obj.page_range, [1, 2, 3])
+        self.assertContains(response, f'page={ PAGES_COUNT }')
+
+    def test_estimated_count_avoids_count_on_whole_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            estimate = estimated_count(Post.objects.all())
+        self.assertGreaterEqual(estimate, POSTS_COUNT)
+        self.assertNotIn('COUNT(', queries.captured_queries[0]['sql'])
+        self.assertEqual(
+            estimated_count(Post.objects.filter(author=self.user)),
+            POSTS_COUNT,
+        )
+
+    def test_page_past_estimate_falls_back_to_last_page(self):
+        Post.objects.filter(
+            pk__in=Post.objects.order_by('pk').values('pk')[:POSTS_COUNT - 1]
+        ).delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(
+                INDEX_URL, {'page': PAGES_COUNT}
+            )
+        counts = [query['sql'] for query in queries.captured_queries
+                  if 'COUNT(' in query['sql'].upper()]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0].upper())
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 1)
+        self.assertEqual(len(page_obj), 1)
+        self.assertFalse(page_obj.has_other_pages())
+
+    @override_settings(PAGINATOR_COUNT_LIMIT=settings.NUM_POSTS + 1)
+    def test_filtered_pages_count_at_most_limit(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(GROUP_LIST_URL)
+        counts = [query['sql'] for query in queries.captured_queries
+                  if 'COUNT(' in query['sql'].upper()]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0].upper())
+        self.assertEqual(response.context['page_obj'].num_pages, 2)
+        response = self.guest_client.get(GROUP_LIST_URL, {'page': 2})
+        self.assertEqual(
+            response.context['page_obj'].num_pages, PAGES_COUNT
+        )
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+USERNAME = 'NoName'
+SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тест текст', author=self.user, group=self.group
+        )
+        self.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[self.post.pk]
+        )
+
+    def test_card_is_reused_until_post_changes(self):
+        self.authorized_client.get(self.POST_DETAIL_URL)
+        Post.objects.filter(pk=self.post.pk).update(
+            text='Изменено в обход сигналов и без сброса кэша'
+        )
+        self.assertNotContains(
+            self.authorized_client.get(self.POST_DETAIL_URL), 'сброса кэша'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            {'text': 'Новый текст', 'group': self.group.pk},
+        )
+        self.assertContains(
+            self.authorized_client.get(self.POST_DETAIL_URL), 'Новый текст'
+        )
+
+    def test_card_follows_group_rename(self):
+        self.authorized_client.get(self.POST_DETAIL_URL)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новый заголовок'
+        group.save()
+        self.assertContains(
+            self.authorized_client.get(self.POST_DETAIL_URL),
+            'Новый заголовок'
+        )
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+
+SLUG = 'test-slug'
+USERNAME = 'NoName'
+USERNAME_2 = 'NoName2'
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME_2])
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug=SLUG,
+            description='Тест описание',
+        )
+        Post.objects.bulk_create(
+            Post(text='Тест текст', author=cls.user2, group=cls.group)
+            for _ in range(settings.NUM_POSTS + 1)
+        )
+        Follow.objects.create(user=cls.user, author=cls.user2)
+        AuthorStats.objects.for_user(cls.user2)
+        cls.post = Post.objects.create(
+            text='Тест текст', author=cls.user2, group=cls.group
+        )
+        commenters = User.objects.bulk_create(
+            User(username=f'commenter{ index }')
+            for index in range(settings.NUM_COMMENTS + 1)
+        )
+        Comment.objects.bulk_create(
+            Comment(text='Тест коммент', post=cls.post, author=author)
+            for author in User.objects.filter(
+                username__in=[user.username for user in commenters]
+            )
+        )
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.post.pk]
+        )
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_pages_use_fixed_number_of_queries(self):
+        cases = [
+            [INDEX_URL, self.guest_client, 2],
+            [GROUP_LIST_URL, self.guest_client, 3],
+            [PROFILE_URL, self.guest_client, 3],
+            [FOLLOW_INDEX_URL, self.authorized_client, 6],
+        ]
+        for address, client, queries in cases:
+            with self.subTest(address=address):
+                with self.assertNumQueries(queries):
+                    response = client.get(address)
+                self.assertEqual(
+                    len(response.context['page_obj']), settings.NUM_POSTS
+                )
+
+    def test_feed_loads_only_rendered_columns(self):
+        post = Post.objects.feed().first()
+        with self.assertNumQueries(0):
+            post.author.username
+            post.group.slug
+            post.group.title
+        self.assertIn('password', post.author.get_deferred_fields())
+        self.assertIn('description', post.group.get_deferred_fields())
+
+    def test_post_detail_loads_comment_page_in_one_query(self):
+        with self.assertNumQueries(3):
+            response = self.guest_client.get(self.POST_DETAIL_URL)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.NUM_COMMENTS)
+        self.assertTrue(comments.has_next())
+        response = self.guest_client.get(
+            self.POST_DETAIL_URL, {'after': comments.next_cursor}
+        )
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertFalse(response.context['comments'].has_next())
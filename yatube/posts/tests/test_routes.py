@@ -16,6 +16,7 @@ class RoutesTest(TestCase):
             ['profile', [USERNAME], f'/profile/{ USERNAME }/'],
             ['post_detail', [POST_ID], f'/posts/{ POST_ID }/'],
             ['follow_index', [], '/follow/'],
+            ['post_search', [], '/search/'],
             ['profile_follow', [USERNAME],
              f'/profile/{ USERNAME }/follow/'],
             ['profile_unfollow', [USERNAME],
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, User
+
+USERNAME = 'NoName'
+SEARCH_URL = reverse('posts:post_search')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post = Post.objects.create(
+            text='Котики любят <спать> на тёплых подоконниках',
+            author=cls.user,
+        )
+        cls.other_post = Post.objects.create(
+            text='Собаки охраняют дом', author=cls.user
+        )
+        cls.guest_client = Client()
+
+    def search(self, query, **params):
+        return self.guest_client.get(SEARCH_URL, {'q': query, **params})
+
+    def test_search_uses_russian_stemming_and_highlights(self):
+        response = self.search('котик подоконник')
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertContains(response, '<mark>Котики</mark>')
+        self.assertContains(response, '<mark>подоконниках</mark>')
+        self.assertContains(response, '&lt;спать&gt;')
+
+    def test_index_follows_post_edit_and_delete(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Коты спят'
+        post.save()
+        self.assertFalse(self.search('подоконник').context['page_obj'])
+        self.assertEqual(list(self.search('кот').context['page_obj']), [post])
+        post.delete()
+        self.assertFalse(self.search('кот').context['page_obj'])
+
+    def test_empty_query_returns_no_results(self):
+        for query in ('', '   ', '!!!'):
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context['page_obj'])
+
+    @override_settings(NUM_POSTS=2)
+    def test_results_are_ranked_and_paged_by_cursor(self):
+        Post.objects.bulk_create(
+            Post(text='кот ' * count + 'мышь', author=self.user)
+            for count in range(1, 6)
+        )
+        search.rebuild()
+        pages = [self.search('кот').context['page_obj']]
+        while pages[-1].has_next():
+            pages.append(self.search(
+                'кот', after=pages[-1].next_cursor
+            ).context['page_obj'])
+        posts = [post for page in pages for post in page]
+        self.assertEqual(len(posts), 5)
+        ranks = [post.rank for post in posts]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        self.assertContains(
+            self.search('кот'),
+            f'?q=%D0%BA%D0%BE%D1%82&amp;after={ pages[0].next_cursor }',
+        )
+        previous = self.search(
+            'кот', before=pages[-1].previous_cursor
+        ).context['page_obj']
+        self.assertEqual(list(previous), list(pages[-2]))
+
+    def test_highlight_trims_long_text_around_match(self):
+        text = 'слово ' * settings.NUM_POSTS * 10 + 'искомое'
+        snippet = search.highlight(text, 'искомое')
+        self.assertTrue(snippet.startswith('…'))
+        self.assertTrue(snippet.endswith('<mark>искомое</mark>'))
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+from collections import Counter
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from .. import transfer
+from ..models import (AuthorStats, Follow, Group, Post, TimelineEntry,
+                      User)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SEED_OPTIONS = {
+    'users': 50,
+    'groups': 3,
+    'posts': 200,
+    'comments': 300,
+    'follows': 5,
+    'images': 0.5,
+    'image_pool': 2,
+    'seed': 7,
+    'batch_size': 40,
+    'stdout': StringIO(),
+}
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def snapshot(self):
+        return {
+            name: list(model.objects.order_by('pk').values_list(*fields))
+            for name, model, fields in transfer.MODELS
+        }
+
+    def test_seed_is_deterministic(self):
+        call_command('seed_yatube', **SEED_OPTIONS)
+        first = self.snapshot()
+        self.assertEqual(len(first['users']), SEED_OPTIONS['users'])
+        self.assertEqual(len(first['posts']), SEED_OPTIONS['posts'])
+        self.assertEqual(len(first['comments']), SEED_OPTIONS['comments'])
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        call_command('seed_yatube', **SEED_OPTIONS)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_seed_builds_skewed_follow_graph_and_derived_data(self):
+        call_command('seed_yatube', **SEED_OPTIONS)
+        followers = Counter(
+            Follow.objects.values_list('author', flat=True)
+        ).most_common()
+        self.assertGreater(followers[0][1], 4 * followers[-1][1])
+        self.assertFalse(
+            Follow.objects.filter(user=F('author')).exists()
+        )
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.get(user=followers[0][0]).followers_count,
+            followers[0][1],
+        )
@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, User
+
+USERNAME = 'NoName'
+USERNAME_2 = 'NoName2'
+POST_CREATE_URL = reverse('posts:post_create')
+PROFILE_URL = reverse('posts:profile', args=[USERNAME_2])
+FOLLOW_URL = reverse('posts:profile_follow', args=[USERNAME_2])
+UNFOLLOW_URL = reverse('posts:profile_unfollow', args=[USERNAME_2])
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def get_stats(self, user):
+        return AuthorStats.objects.for_user(user)
+
+    def test_post_create_and_delete_update_posts_count(self):
+        self.authorized_client.post(POST_CREATE_URL, {'text': 'Тест текст'})
+        self.assertEqual(self.get_stats(self.user).posts_count, 1)
+        post = Post.objects.get(author=self.user)
+        self.authorized_client.get(
+            reverse('posts:delete_post', args=[post.pk])
+        )
+        self.assertEqual(self.get_stats(self.user).posts_count, 0)
+
+    def test_follow_and_unfollow_update_counters(self):
+        self.authorized_client.get(FOLLOW_URL)
+        self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(self.get_stats(self.user).following_count, 1)
+        self.assertEqual(self.get_stats(self.user2).followers_count, 1)
+        self.authorized_client.get(UNFOLLOW_URL)
+        self.assertEqual(self.get_stats(self.user).following_count, 0)
+        self.assertEqual(self.get_stats(self.user2).followers_count, 0)
+
+    def test_profile_shows_stored_counters(self):
+        AuthorStats.objects.for_user(self.user2)
+        AuthorStats.objects.change(self.user2, followers_count=7)
+        response = self.authorized_client.get(PROFILE_URL)
+        self.assertEqual(response.context['stats'].followers_count, 7)
+
+    def test_recount_command_fixes_drift(self):
+        Follow.objects.create(user=self.user, author=self.user2)
+        AuthorStats.objects.for_user(self.user2)
+        AuthorStats.objects.change(self.user2, followers_count=5)
+        call_command('recount_author_stats', stdout=StringIO())
+        self.assertEqual(self.get_stats(self.user2).followers_count, 1)
+        self.assertEqual(self.get_stats(self.user).following_count, 1)
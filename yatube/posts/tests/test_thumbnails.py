@@ -0,0 +1,194 @@
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from .. import thumbnail_gc, thumbnails
+from ..models import Post, ThumbnailJob, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+USERNAME = 'NoName'
+POST_CREATE_URL = reverse('posts:post_create')
+PLACEHOLDER = 'Изображение обрабатывается'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailJobTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self):
+        self.authorized_client.post(POST_CREATE_URL, {
+            'text': 'Тест текст',
+            'image': SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        })
+        return Post.objects.get(author=self.user)
+
+    def test_upload_is_thumbnailed_in_background(self):
+        post = self.create_post()
+        detail_url = reverse('posts:post_detail', args=[post.pk])
+        self.assertTrue(post.thumbnail_pending)
+        self.assertContains(
+            self.authorized_client.get(detail_url), PLACEHOLDER
+        )
+        self.assertEqual(thumbnails.run_pending(), 1)
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnail_pending)
+        self.assertEqual(
+            post.thumbnail_jobs.get().status, ThumbnailJob.DONE
+        )
+        response = self.authorized_client.get(detail_url)
+        self.assertNotContains(response, PLACEHOLDER)
+        self.assertContains(response, '<img class="card-img my-2"')
+        self.assertContains(response, 'type="image/webp"')
+        for width in thumbnails.POST_THUMBNAIL_WIDTHS:
+            with self.subTest(width=width):
+                self.assertContains(response, f'.webp { width }w')
+                self.assertContains(response, f'.jpg { width }w')
+
+    def test_missing_thumbnails_show_original_until_queued(self):
+        post = Post.objects.create(
+            text='Тест текст',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        detail_url = reverse('posts:post_detail', args=[post.pk])
+        response = self.authorized_client.get(detail_url)
+        self.assertContains(response, f'src="{ post.image.url }"')
+        self.assertNotContains(response, 'srcset=')
+        self.assertFalse(post.thumbnail_jobs.exists())
+        call_command('queue_thumbnails', stdout=StringIO())
+        self.assertContains(
+            self.authorized_client.get(detail_url), PLACEHOLDER
+        )
+        thumbnails.run_pending()
+        response = self.authorized_client.get(detail_url)
+        self.assertNotContains(response, PLACEHOLDER)
+        self.assertContains(response, 'srcset=')
+
+    def test_existing_images_are_queued_by_command(self):
+        post = Post.objects.create(
+            text='Тест текст',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        Post.objects.create(text='Без картинки', author=self.user)
+        out = StringIO()
+        call_command('queue_thumbnails', batch_size=1, stdout=out)
+        self.assertIn('Поставлено задач: 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_pending)
+        self.assertEqual(thumbnails.run_pending(), 1)
+        call_command('queue_thumbnails', stdout=out)
+        self.assertEqual(ThumbnailJob.objects.count(), 1)
+
+    @override_settings(THUMBNAIL_MAX_ATTEMPTS=2)
+    def test_failing_job_is_retried_then_given_up(self):
+        post = self.create_post()
+        post.image.delete(save=False)
+        with self.assertLogs('sorl.thumbnail', 'ERROR') as logs:
+            thumbnails.run_pending()
+        self.assertIn('FileNotFoundError', logs.output[0])
+        job = post.thumbnail_jobs.get()
+        self.assertEqual(job.status, ThumbnailJob.PENDING)
+        with self.assertLogs('sorl.thumbnail', 'ERROR'):
+            thumbnails.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ThumbnailJob.FAILED)
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnail_pending)
+
+    def test_collect_removes_thumbnails_of_deleted_posts(self):
+        post = self.create_post()
+        thumbnails.run_pending()
+        names = [
+            default.kvstore._get(key).name
+            for key in default.kvstore._get(
+                ImageFile(post.image).key, identity='thumbnails'
+            )
+        ]
+        self.assertEqual(len(names), len(list(thumbnails.variants())))
+        self.assertEqual(thumbnail_gc.collect(), (0, 0, 0))
+        post.delete()
+        report = thumbnail_gc.collect(batch_size=1)
+        self.assertEqual(report.sources, 1)
+        self.assertEqual(report.files, len(names))
+        self.assertGreater(report.bytes, 0)
+        for name in names:
+            with self.subTest(name=name):
+                self.assertFalse(default.storage.exists(name))
+        self.assertFalse(
+            list(default.kvstore._find_keys(identity='thumbnails'))
+        )
+
+    def test_collect_removes_only_stale_unknown_files(self):
+        stale = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'ab', 'stale.jpg')
+        fresh = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'ab', 'fresh.jpg')
+        os.makedirs(os.path.dirname(stale), exist_ok=True)
+        for path in (stale, fresh):
+            with open(path, 'wb') as file_:
+                file_.write(SMALL_GIF)
+        expired = time.time() - settings.THUMBNAIL_GC_GRACE - 1
+        os.utime(stale, (expired, expired))
+        report = thumbnail_gc.collect(dry_run=True)
+        self.assertEqual(report, (0, 1, len(SMALL_GIF)))
+        self.assertTrue(os.path.exists(stale))
+        thumbnail_gc.collect()
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+
+
+class ThumbnailEngineTests(TestCase):
+    def test_metadata_is_stripped(self):
+        image = Image.new('RGB', (40, 20))
+        source = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        image.save(source, 'JPEG', exif=exif, icc_profile=b'profile')
+        source.seek(0)
+        image = Image.open(source)
+        self.assertIn('exif', image.info)
+        raw = default.engine._get_raw_data(
+            image, 'JPEG', 80, image_info={'icc_profile': b'profile'}
+        )
+        stripped = Image.open(BytesIO(raw))
+        self.assertNotIn('exif', stripped.info)
+        self.assertNotIn('icc_profile', stripped.info)
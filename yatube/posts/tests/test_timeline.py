@@ -0,0 +1,151 @@
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Follow, Post, TimelineEntry, User
+
+USERNAME = 'NoName'
+USERNAME_2 = 'NoName2'
+FOLLOW_URL = reverse('posts:profile_follow', args=[USERNAME_2])
+UNFOLLOW_URL = reverse('posts:profile_unfollow', args=[USERNAME_2])
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+PUB_DATE = timezone.make_aware(datetime(2022, 1, 1))
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user2 = User.objects.create_user(username=USERNAME_2)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_timeline(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.user)
+            .values_list('post', flat=True)
+        )
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        Follow.objects.create(user=self.user, author=self.user2)
+        post = Post.objects.create(text='Тест текст', author=self.user2)
+        self.assertEqual(self.get_timeline(), [post.pk])
+
+    def test_follow_backfills_and_unfollow_trims_timeline(self):
+        post = Post.objects.create(text='Тест текст', author=self.user2)
+        self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(self.get_timeline(), [post.pk])
+        self.authorized_client.get(UNFOLLOW_URL)
+        self.assertEqual(self.get_timeline(), [])
+
+    @override_settings(TIMELINE_BACKFILL=2)
+    def test_backfill_all_keeps_latest_posts_of_each_follow(self):
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст { i }', author=author)
+            for author in (self.user, self.user2) for i in range(3)
+        )
+        for day, post in enumerate(Post.objects.order_by('pk'), 1):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=PUB_DATE.replace(day=day)
+            )
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=self.user2),
+            Follow(user=self.user2, author=self.user),
+        ])
+        # SQLite умеет оконные функции с 3.25, но Django 2.2 об этом не
+        # знает; проверяем и запрос с ROW_NUMBER(), и запасной путь.
+        for over_clause in (True, False):
+            TimelineEntry.objects.all().delete()
+            with mock.patch.object(
+                connection.features, 'supports_over_clause', over_clause
+            ):
+                TimelineEntry.objects.backfill_all()
+                TimelineEntry.objects.backfill_all()
+            for reader, author in ((self.user, self.user2),
+                                   (self.user2, self.user)):
+                with self.subTest(over_clause=over_clause, reader=reader):
+                    self.assertEqual(
+                        set(TimelineEntry.objects.filter(
+                            user=reader
+                        ).values_list('post', flat=True)),
+                        set(author.posts.order_by('-pub_date').values_list(
+                            'pk', flat=True
+                        )[:2]),
+                    )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_posts_are_read_on_the_fly(self):
+        self.authorized_client.get(FOLLOW_URL)
+        post = Post.objects.create(text='Тест текст', author=self.user2)
+        self.assertEqual(self.get_timeline(), [])
+        response = self.authorized_client.get(FOLLOW_INDEX_URL)
+        self.assertEqual(list(response.context['page_obj']), [post])
+        call_command('fan_out_celebrities', stdout=StringIO())
+        call_command('fan_out_celebrities', stdout=StringIO())
+        self.assertEqual(self.get_timeline(), [post.pk])
+        response = self.authorized_client.get(FOLLOW_INDEX_URL)
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_follow_index_merges_timeline_with_celebrity_posts(self):
+        self.authorized_client.get(FOLLOW_URL)
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст { i }', author=self.user2)
+            for i in range(settings.NUM_POSTS + 1)
+        )
+        Post.objects.update(pub_date=PUB_DATE)
+        posts = list(Post.objects.order_by('-pk'))
+        # Половина постов уже в ленте, остальные читаются на лету.
+        TimelineEntry.objects.add_posts(
+            self.user.pk, Post.objects.filter(pk__in=[
+                post.pk for post in posts[::2]
+            ])
+        )
+        first = self.authorized_client.get(
+            FOLLOW_INDEX_URL
+        ).context['page_obj']
+        second = self.authorized_client.get(
+            FOLLOW_INDEX_URL, {'after': first.next_cursor}
+        ).context['page_obj']
+        back = self.authorized_client.get(
+            FOLLOW_INDEX_URL, {'before': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual([*first, *second], posts)
+        self.assertEqual(list(back), list(first))
+        self.assertEqual(first.num_pages, 2)
+
+    def test_follow_index_pages_by_cursor(self):
+        Follow.objects.create(user=self.user, author=self.user2)
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст { i }', author=self.user2)
+            for i in range(settings.NUM_POSTS + 1)
+        )
+        # Одинаковое время публикации: порядок держится на id поста.
+        Post.objects.update(pub_date=PUB_DATE)
+        TimelineEntry.objects.add_posts(
+            self.user.pk, Post.objects.filter(author=self.user2)
+        )
+        first = self.authorized_client.get(
+            FOLLOW_INDEX_URL
+        ).context['page_obj']
+        second = self.authorized_client.get(
+            FOLLOW_INDEX_URL, {'after': first.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(first), settings.NUM_POSTS)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(
+            {post.pk for post in [*first, *second]},
+            set(Post.objects.values_list('pk', flat=True)),
+        )
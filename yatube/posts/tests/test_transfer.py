@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import search, transfer
+from ..models import (AuthorStats, Comment, Follow, Group, Post,
+                      TimelineEntry, User)
+
+TEMP_DATA_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NoName')
+        cls.user2 = User.objects.create_user(username='NoName2')
+        cls.group = Group.objects.create(
+            title='Тест заголовок',
+            slug='test-slug',
+            description='Тест описание',
+        )
+        cls.post = Post.objects.create(
+            text='Котики спят', author=cls.user2, group=cls.group
+        )
+        Post.objects.filter(pk=cls.post.pk).update(
+            pub_date='2019-10-05T21:37:36Z'
+        )
+        Comment.objects.create(
+            text='Тест коммент', post=cls.post, author=cls.user
+        )
+        Follow.objects.create(user=cls.user, author=cls.user2)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DATA_DIR, ignore_errors=True)
+
+    def snapshot(self):
+        return {
+            name: list(model.objects.order_by('pk').values_list(*fields))
+            for name, model, fields in transfer.MODELS
+        }
+
+    def test_export_import_round_trip(self):
+        expected = self.snapshot()
+        call_command('export_yatube', TEMP_DATA_DIR, stdout=StringIO())
+        for name, _, _ in transfer.MODELS:
+            with self.subTest(name=name):
+                self.assertTrue(
+                    os.path.exists(transfer.path_for(TEMP_DATA_DIR, name))
+                )
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        call_command(
+            'import_yatube', TEMP_DATA_DIR, batch_size=1, stdout=StringIO()
+        )
+        self.assertEqual(self.snapshot(), expected)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.user, post=self.post
+        ).exists())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user2).followers_count, 1
+        )
+        self.assertEqual(
+            list(search.SearchPaginator('котик', 10).get_page()),
+            [self.post],
+        )
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -62,6 +63,9 @@ class PostURLTests(TestCase):
             description='Тест описание',
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_urls_uses_correct_template(self):
         template_urls_names = {
             INDEX_URL: 'posts/index.html',
@@ -7,6 +7,8 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from core.cache import POSTS_GENERATION, generation_key
+
 from ..models import Follow, Group, Post, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -73,6 +75,9 @@ class PostsViewsTests(TestCase):
         super().tearDownClass()
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
+    def setUp(self):
+        cache.clear()
+
     def test_pages_show_correct_context(self):
         addresses = [
             PROFILE_URL,
@@ -147,18 +152,40 @@ class PostsViewsTests(TestCase):
 
     def test_cache_index(self):
         response = self.authorized_client.get(INDEX_URL).content
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        self.assertEqual(
+            response, self.authorized_client.get(INDEX_URL).content
+        )
         Post.objects.create(
             author=self.user,
             text='Тестовый текст'
         )
-        self.assertEqual(
-            response, self.authorized_client.get(INDEX_URL).content
-        )
-        cache.clear()
         self.assertNotEqual(
             response, self.authorized_client.get(INDEX_URL).content
         )
 
+    def test_new_post_shown_after_generation_eviction(self):
+        self.authorized_client.get(INDEX_URL)
+        Post.objects.create(author=self.user, text='До вытеснения')
+        self.authorized_client.get(INDEX_URL)
+        cache.delete(generation_key(POSTS_GENERATION))
+        Post.objects.create(author=self.user, text='После вытеснения')
+        self.assertContains(
+            self.authorized_client.get(INDEX_URL), 'После вытеснения'
+        )
+
+    def test_cached_fragments_invalidated_on_post_and_group_change(self):
+        cache.clear()
+        group = Group.objects.get(pk=self.group.pk)
+        for address in (INDEX_URL, GROUP_LIST_URL, self.POST_DETAIL_URL):
+            with self.subTest(address=address):
+                self.authorized_client.get(address)
+                group.title = f'Новый заголовок { address }'
+                group.save()
+                self.assertContains(
+                    self.authorized_client.get(address), group.title
+                )
+
     def test_authorized_user_can_follow_authors(self):
         Follow.objects.all().delete()
         self.authorized_client.get(FOLLOW_URL)
@@ -0,0 +1,9 @@
+from sorl.thumbnail.engines.pil_engine import Engine as PILEngine
+
+
+class Engine(PILEngine):
+    def _get_raw_data(self, image, format_, quality, image_info=None,
+                      progressive=False):
+        return super()._get_raw_data(
+            image, format_, quality, image_info={}, progressive=progressive
+        )
@@ -0,0 +1,117 @@
+import os
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.kvstores.base import add_prefix
+
+from .models import Post
+
+Report = namedtuple('Report', ['sources', 'files', 'bytes'])
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_size(name):
+    try:
+        return default.storage.size(name)
+    except OSError:
+        return 0
+
+
+def delete_file(name, dry_run):
+    size = file_size(name)
+    if not dry_run:
+        default.storage.delete(name)
+    return size
+
+
+def source_names(keys):
+    names = {}
+    for key in keys:
+        source = default.kvstore._get(key)
+        names[key] = source.name if source is not None else None
+    return names
+
+
+def collect_sources(batch_size, dry_run):
+    sources = files = reclaimed = 0
+    keys = list(default.kvstore._find_keys(identity='thumbnails'))
+    for batch in batches(keys, batch_size):
+        names = source_names(batch)
+        # Перечитываем живые изображения на каждую пачку: пост мог
+        # получить картинку, пока мы обходили хранилище.
+        live = set(Post.objects.filter(
+            image__in=[name for name in names.values() if name]
+        ).values_list('image', flat=True))
+        raw_keys = []
+        for key, name in names.items():
+            if name in live:
+                continue
+            sources += 1
+            for thumbnail_key in default.kvstore._get(
+                key, identity='thumbnails'
+            ) or []:
+                thumbnail = default.kvstore._get(thumbnail_key)
+                if thumbnail is not None:
+                    files += 1
+                    reclaimed += delete_file(thumbnail.name, dry_run)
+                raw_keys.append(add_prefix(thumbnail_key))
+            raw_keys += [add_prefix(key), add_prefix(key, 'thumbnails')]
+        if raw_keys and not dry_run:
+            default.kvstore._delete_raw(*raw_keys)
+    return Report(sources, files, reclaimed)
+
+
+def walk(path):
+    directories, files = default.storage.listdir(path)
+    for name in files:
+        yield os.path.join(path, name)
+    for directory in directories:
+        yield from walk(os.path.join(path, directory))
+
+
+def stored_files():
+    prefix = thumbnail_settings.THUMBNAIL_PREFIX.rstrip('/')
+    if not default.storage.exists(prefix):
+        return
+    yield from walk(prefix)
+
+
+def collect_files(dry_run):
+    referenced = set()
+    for key in default.kvstore._find_keys(identity='image'):
+        image = default.kvstore._get(key)
+        if image is not None:
+            referenced.add(image.name)
+    # Свежие файлы не трогаем: воркер мог записать миниатюру, но ещё
+    # не успел сохранить её в хранилище ключей.
+    deadline = timezone.now() - timedelta(seconds=settings.THUMBNAIL_GC_GRACE)
+    files = reclaimed = 0
+    for name in stored_files():
+        if name in referenced:
+            continue
+        if default.storage.get_modified_time(name) > deadline:
+            continue
+        files += 1
+        reclaimed += delete_file(name, dry_run)
+    return Report(0, files, reclaimed)
+
+
+def collect(batch_size=None, dry_run=False):
+    batch_size = batch_size or settings.THUMBNAIL_GC_BATCH_SIZE
+    sources = collect_sources(batch_size, dry_run)
+    files = collect_files(dry_run)
+    return Report(*(sum(values) for values in zip(sources, files)))
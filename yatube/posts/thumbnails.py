@@ -0,0 +1,195 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from core.cache import bump_generation
+
+from .models import Post, ThumbnailJob
+
+POST_THUMBNAIL_RATIO = 339 / 960
+POST_THUMBNAIL_WIDTHS = (480, 960, 1440)
+POST_THUMBNAIL_DEFAULT_WIDTH = 960
+POST_THUMBNAIL_FORMATS = (
+    ('WEBP', 'image/webp', {'quality': 80}),
+    ('JPEG', 'image/jpeg', {'quality': 82, 'progressive': True}),
+)
+POST_THUMBNAIL_SIZES = '(max-width: 992px) 100vw, 960px'
+
+executor = None
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return executor
+
+
+def variants():
+    for format_, mime_type, options in POST_THUMBNAIL_FORMATS:
+        for width in POST_THUMBNAIL_WIDTHS:
+            geometry = f'{ width }x{ round(width * POST_THUMBNAIL_RATIO) }'
+            yield mime_type, width, geometry, dict(
+                options, crop='center', upscale=True, format=format_
+            )
+
+
+def cached_thumbnail(image, geometry, options):
+    # Те же имя и опции, что у get_thumbnail, но только поиск в хранилище
+    # ключей: исходник при показе страницы не читается.
+    options = dict(options)
+    for key, value in default.backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in default.backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    name = default.backend._get_thumbnail_filename(
+        ImageFile(image), geometry, options
+    )
+    return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def picture(post):
+    if post.thumbnail_pending:
+        return {'pending': True}
+    sources = {}
+    fallback = None
+    for mime_type, width, geometry, options in variants():
+        thumbnail = cached_thumbnail(post.image, geometry, options)
+        if thumbnail is None:
+            # Пост загружен до очереди, задача упала или миниатюры
+            # удалены: показываем оригинал, задачи ставят queue_thumbnails
+            # и process_thumbnails.
+            return {'srcset': '', 'sources': [], 'fallback': post.image}
+        sources.setdefault(mime_type, []).append(
+            f'{ thumbnail.url } { width }w'
+        )
+        if (mime_type == 'image/jpeg'
+                and width == POST_THUMBNAIL_DEFAULT_WIDTH):
+            fallback = thumbnail
+    return {
+        'sources': [
+            (mime_type, ', '.join(srcset))
+            for mime_type, srcset in sources.items()
+            if mime_type != 'image/jpeg'
+        ],
+        'srcset': ', '.join(sources['image/jpeg']),
+        'sizes': POST_THUMBNAIL_SIZES,
+        'fallback': fallback,
+    }
+
+
+def generate(post):
+    for _, _, geometry, options in variants():
+        thumbnail = get_thumbnail(post.image, geometry, **options)
+        if not thumbnail.exists():
+            raise FileNotFoundError(
+                f'Не удалось обработать { post.image.name }'
+            )
+
+
+def submit(job):
+    if settings.THUMBNAIL_ASYNC:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_in_thread, job.pk)
+        )
+    return job
+
+
+def enqueue(post):
+    Post.objects.filter(pk=post.pk).update(thumbnail_pending=True)
+    post.thumbnail_pending = True
+    return submit(ThumbnailJob.objects.create(post=post))
+
+
+def queue_existing(batch_size):
+    posts = Post.objects.exclude(image='').filter(
+        thumbnail_pending=False, thumbnail_jobs__isnull=True
+    ).order_by('pk').values_list('pk', flat=True)
+    queued = 0
+    while True:
+        with transaction.atomic():
+            ids = list(posts[:batch_size])
+            if not ids:
+                return queued
+            Post.objects.filter(pk__in=ids).update(
+                thumbnail_pending=True, updated=timezone.now()
+            )
+            ThumbnailJob.objects.bulk_create(
+                ThumbnailJob(post_id=pk) for pk in ids
+            )
+        queued += len(ids)
+
+
+def claim(job_id):
+    return ThumbnailJob.objects.filter(
+        pk=job_id, status=ThumbnailJob.PENDING
+    ).update(status=ThumbnailJob.RUNNING, updated=timezone.now())
+
+
+def run(job_id):
+    if not claim(job_id):
+        return False
+    job = ThumbnailJob.objects.select_related('post').get(pk=job_id)
+    try:
+        generate(job.post)
+    except Exception as error:
+        job.attempts += 1
+        job.error = repr(error)
+        job.status = (
+            ThumbnailJob.FAILED
+            if job.attempts >= settings.THUMBNAIL_MAX_ATTEMPTS
+            else ThumbnailJob.PENDING
+        )
+        job.save(update_fields=['attempts', 'error', 'status', 'updated'])
+        if job.status == ThumbnailJob.PENDING:
+            return False
+    else:
+        job.status = ThumbnailJob.DONE
+        job.save(update_fields=['status', 'updated'])
+    if not job.post.thumbnail_jobs.filter(
+        status__in=(ThumbnailJob.PENDING, ThumbnailJob.RUNNING)
+    ).exists():
+        Post.objects.filter(pk=job.post_id).update(
+            thumbnail_pending=False, updated=timezone.now()
+        )
+        bump_generation()
+    return job.status == ThumbnailJob.DONE
+
+
+def run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run(job_id)
+    finally:
+        connection.close()
+
+
+def requeue_stale():
+    return ThumbnailJob.objects.filter(
+        status=ThumbnailJob.RUNNING,
+        updated__lt=timezone.now() - timedelta(
+            seconds=settings.THUMBNAIL_JOB_TIMEOUT
+        ),
+    ).update(status=ThumbnailJob.PENDING)
+
+
+def run_pending(limit=None):
+    requeue_stale()
+    jobs = ThumbnailJob.objects.filter(
+        status=ThumbnailJob.PENDING
+    ).values_list('pk', flat=True)
+    if limit:
+        jobs = jobs[:limit]
+    return sum(run(job_id) for job_id in list(jobs))
@@ -0,0 +1,109 @@
+import datetime
+import json
+import os
+from contextlib import contextmanager
+from io import StringIO
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from core.cache import bump_generation
+
+from . import search
+from .models import Comment, Follow, Group, Post, TimelineEntry, User
+
+MODELS = (
+    ('users', User, (
+        'id', 'username', 'password', 'first_name', 'last_name', 'email',
+        'is_staff', 'is_active', 'is_superuser', 'date_joined', 'last_login',
+    )),
+    ('groups', Group, ('id', 'title', 'slug', 'description')),
+    ('posts', Post, (
+        'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+    )),
+    ('comments', Comment, ('id', 'text', 'pub_date', 'post_id', 'author_id')),
+    ('follows', Follow, ('id', 'user_id', 'author_id')),
+)
+EXTENSION = '.ndjson'
+
+
+class Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder обрезает время до миллисекунд, а курсоры
+        # пагинации сравнивают даты точно.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def path_for(directory, name):
+    return os.path.join(directory, f'{ name }{ EXTENSION }')
+
+
+def export_model(model, fields, file_, chunk_size):
+    count = 0
+    rows = model.objects.order_by('pk').values(*fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        file_.write(json.dumps(row, cls=Encoder, ensure_ascii=False))
+        file_.write('\n')
+        count += 1
+    return count
+
+
+def read_rows(file_):
+    for line in file_:
+        if line.strip():
+            yield json.loads(line)
+
+
+@contextmanager
+def keep_dates(model):
+    # bulk_create, в отличие от loaddata, вызывает pre_save и затёр бы
+    # выгруженные даты текущим временем.
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def import_model(model, rows, batch_size):
+    count = 0
+    rows = iter(rows)
+    with keep_dates(model):
+        while True:
+            batch = [model(**row) for row in islice(rows, batch_size)]
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            count += len(batch)
+    return count
+
+
+def reset_sequences():
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [model for _, model, _ in MODELS]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def rebuild_derived():
+    # Сигналы при bulk_create не срабатывают, поэтому ленты, счётчики и
+    # поисковый индекс заполняем отдельно.
+    with transaction.atomic():
+        TimelineEntry.objects.backfill_all()
+        search.rebuild()
+    call_command('recount_author_stats', stdout=StringIO())
+    bump_generation()
@@ -17,6 +17,9 @@ urlpatterns = [
     path('posts/<int:post_id>/',
          views.post_detail,
          name='post_detail'),
+    path('search/',
+         views.post_search,
+         name='post_search'),
     path('create/',
          views.post_create,
          name='post_create'),
@@ -1,60 +1,118 @@
+from functools import partial
+from operator import attrgetter
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.response import TemplateResponse
+from django.utils.http import urlencode
+
+from core.decorators import conditional_page, query_budget
+from core.paginator import (CursorPaginator, MergedCursorPaginator,
+                            capped_count, estimated_count)
 
+from . import conditional, search, thumbnails
 from .forms import CommentForm, GroupForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import (AuthorStats, Follow, Group, Post, TimelineEntry,
+                     User)
+
+
+def get_page(request, objects_list, count=None, estimated=False,
+             pk_field='pk'):
+    if count is None:
+        count = partial(
+            estimated_count if estimated else capped_count, objects_list
+        )
+    paginator = CursorPaginator(
+        objects_list,
+        settings.NUM_POSTS,
+        count=count,
+        window=settings.PAGINATOR_WINDOW,
+        pk_field=pk_field,
+    )
+    return read_page(request, paginator)
 
 
-def get_page(request, objects_list):
-    paginator = Paginator(objects_list, settings.NUM_POSTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def read_page(request, paginator):
+    return paginator.get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        page=request.GET.get('page'),
+    )
 
 
+@query_budget(5)
+@conditional_page(conditional.index_state, cache=True)
 def index(request):
-    return render(
+    return TemplateResponse(
         request,
         'posts/index.html',
-        {'page_obj': get_page(request, Post.objects.all())}
+        {'page_obj': get_page(request, Post.objects.feed(), estimated=True)}
     )
 
 
+@query_budget(6)
+@conditional_page(conditional.group_state, cache=True)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     context = {
         'group': group,
-        'page_obj': get_page(request, group.posts.all())
+        'page_obj': get_page(request, group.posts.feed())
     }
-    return render(request, 'posts/group_list.html', context)
+    return TemplateResponse(request, 'posts/group_list.html', context)
 
 
+@query_budget(7)
+@conditional_page(conditional.profile_state, cache=True)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    following = (
-        request.user.is_authenticated
-        and request.user != author
-        and Follow.objects.filter(user=request.user, author=author).exists()
-    )
+    stats = AuthorStats.objects.for_user(author)
     context = {
-        'page_obj': get_page(request, author.posts.all()),
+        'page_obj': get_page(
+            request, author.posts.feed(), count=stats.posts_count
+        ),
         'author': author,
-        'following': following,
+        'stats': stats,
     }
-    return render(request, 'posts/profile.html', context)
+    return TemplateResponse(request, 'posts/profile.html', context)
+
+
+@query_budget(5)
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = search.SearchPaginator(query, settings.NUM_POSTS).get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'query_string': urlencode({'q': query}),
+        'page_obj': page_obj,
+    })
 
 
+@query_budget(6)
+@conditional_page(conditional.post_state)
 def post_detail(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.feed(), pk=post_id)
+    comments = CursorPaginator(
+        post.comments.thread(), settings.NUM_COMMENTS
+    ).get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
     context = {
         'post': post,
+        'stats': AuthorStats.objects.for_user(post.author),
         'form': form,
+        'comments': comments,
     }
-    return render(request, 'posts/post_detail.html', context)
+    return TemplateResponse(request, 'posts/post_detail.html', context)
 
 
+@query_budget(12)
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -62,10 +120,15 @@ def post_create(request):
         return render(request, 'posts/create_post.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    with transaction.atomic():
+        post.save()
+        AuthorStats.objects.change(request.user, posts_count=1)
+        if post.image:
+            thumbnails.enqueue(post)
     return redirect('posts:profile', request.user.username)
 
 
+@query_budget(12)
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -82,10 +145,14 @@ def post_edit(request, post_id):
             'is_edit': True,
             'post': post,
         })
-    form.save()
+    with transaction.atomic():
+        form.save()
+        if 'image' in form.changed_data and post.image:
+            thumbnails.enqueue(post)
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(5)
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -98,29 +165,56 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(10)
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
-        Follow.objects.get_or_create(user=request.user, author=author)
+        with transaction.atomic():
+            _, created = Follow.objects.get_or_create(
+                user=request.user, author=author
+            )
+            if created:
+                AuthorStats.objects.change(request.user, following_count=1)
+                AuthorStats.objects.change(author, followers_count=1)
     return redirect('posts:profile', username=username)
 
 
+@query_budget(8)
 @login_required
 def profile_unfollow(request, username):
-    get_object_or_404(
-        Follow, user=request.user, author__username=username
-    ).delete()
+    follow = get_object_or_404(
+        Follow.objects.select_related('author'),
+        user=request.user,
+        author__username=username,
+    )
+    with transaction.atomic():
+        follow.delete()
+        AuthorStats.objects.change(request.user, following_count=-1)
+        AuthorStats.objects.change(follow.author, followers_count=-1)
     return redirect('posts:profile', username=username)
 
 
+@query_budget(8)
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    context = {'page_obj': get_page(request, posts)}
+    paginator = MergedCursorPaginator(
+        [
+            (TimelineEntry.objects.feed(request.user), 'post_id',
+             attrgetter('post')),
+            (TimelineEntry.objects.celebrity_posts(request.user), 'pk',
+             None),
+        ],
+        settings.NUM_POSTS,
+        window=settings.PAGINATOR_WINDOW,
+    )
+    paginator.count = paginator.rows
+    page_obj = read_page(request, paginator)
+    context = {'page_obj': page_obj}
     return render(request, 'posts/follow.html', context)
 
 
+@query_budget(5)
 @login_required
 def group_create(request):
     form = GroupForm(request.POST or None)
@@ -131,9 +225,12 @@ def group_create(request):
     return redirect('posts:profile', request.user.username)
 
 
+@query_budget(11)
 @login_required
 def delete_post(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if request.user == post.author and request.user.is_authenticated:
-        post.delete()
+        with transaction.atomic():
+            post.delete()
+            AuthorStats.objects.change(request.user, posts_count=-1)
     return redirect('posts:profile', request.user.username)
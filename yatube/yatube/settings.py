@@ -1,4 +1,6 @@
+import json
 import os
+from itertools import zip_longest
 
 from dotenv import load_dotenv
 
@@ -24,14 +26,17 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,7 +44,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 INTERNAL_IPS = [
@@ -60,6 +64,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.generation.cache_generation',
             ],
         },
     },
@@ -74,9 +79,34 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', 'true').lower() == 'true'
+# Пул процесса для многопоточных серверов, 0 — выключен. Проверку и пул
+# делают обёртки над postgresql и sqlite3.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+if DB_HEALTH_CHECKS or DB_POOL_SIZE:
+    DATABASES['default']['ENGINE'] = 'core.backends.' + (
+        DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]
+    )
+
+# Реплики только для чтения: DB_REPLICA_HOSTS и (или) DB_REPLICA_NAMES через
+# запятую, остальные параметры берутся у основной базы.
+DATABASE_REPLICAS = []
+for index, (host, name) in enumerate(zip_longest(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')),
+    filter(None, os.getenv('DB_REPLICA_NAMES', '').split(',')),
+), start=1):
+    DATABASES[f'replica{ index }'] = dict(
+        DATABASES['default'],
+        HOST=host or DATABASES['default']['HOST'],
+        NAME=name or DATABASES['default']['NAME'],
+    )
+    DATABASE_REPLICAS.append(f'replica{ index }')
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,6 +150,8 @@ EMAIL_HOST_USER = 'rogozin.il2399@gmail.com'
 EMAIL_HOST_PASSWORD = ''
 
 if DEBUG:
+    INSTALLED_APPS += ['debug_toolbar']
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
     EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
     EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
     EMAIL_HOST = '127.0.0.1'
@@ -129,16 +161,96 @@ if DEBUG:
     EMAIL_USE_TLS = False
     DEFAULT_FROM_EMAIL = 'testing@example.com'
 
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv('INSTRUMENTATION_SAMPLE_RATE', 0.1)
+)
+
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'off')
+QUERY_BUDGETS = {}
+QUERY_BUDGET_IGNORED_TABLES = ('thumbnail_kvstore',)
+
+TEST_RUNNER = 'core.runner.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'yatube.requests': {
+            'handlers': ['requests'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'yatube.queries': {
+            'handlers': ['requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 NUM_POSTS = 10
+ANONYMOUS_CACHE_SECONDS = int(os.getenv('ANONYMOUS_CACHE_SECONDS', 60))
+PAGE_CACHE_SECONDS = int(os.getenv('PAGE_CACHE_SECONDS', 5 * 60))
+FRAGMENT_CACHE_SECONDS = int(os.getenv('FRAGMENT_CACHE_SECONDS', 60 * 60))
+NUM_COMMENTS = 20
+PAGINATOR_WINDOW = 2
+PAGINATOR_COUNT_LIMIT = 1000
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_BACKFILL = 100
+TIMELINE_CELEBRITY_WINDOW = 24 * 60 * 60
 UPLOAD_TO = 'posts/'
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+THUMBNAIL_ENGINE = 'posts.thumbnail_engine.Engine'
+THUMBNAIL_ASYNC = True
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_MAX_ATTEMPTS = 3
+THUMBNAIL_JOB_TIMEOUT = 5 * 60
+THUMBNAIL_GC_BATCH_SIZE = 50
+THUMBNAIL_GC_GRACE = 60 * 60
+THUMBNAIL_GC_INTERVAL = 60 * 60
+
+API_MAX_BATCH = int(os.getenv('API_MAX_BATCH', 100))
+API_RATE_LIMIT = int(os.getenv('API_RATE_LIMIT', 1000))
+API_RATE_PERIOD = 60 * 60
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+# MAX_ENTRIES понимают только бэкенды с собственной очисткой; клиенты
+# memcached и других серверов получают OPTIONS как аргументы и падают
+# на незнакомых ключах.
+CULLING_CACHE_BACKENDS = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+CACHE_OPTIONS = json.loads(os.getenv('CACHE_OPTIONS', '{}'))
+if CACHE_BACKEND in CULLING_CACHE_BACKENDS:
+    CACHE_OPTIONS.setdefault(
+        'MAX_ENTRIES', int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    )
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backends.InstrumentedCache',
+        'WRAPPED_BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+        ),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'yatube'),
+        'OPTIONS': CACHE_OPTIONS,
     }
 }